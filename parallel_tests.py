@@ -0,0 +1,117 @@
+"""
+Параллельный запуск тестов одного проекта.
+
+Набор тестов делится на части подряд, в порядке сбора: так тесты одного
+класса почти всегда попадают в одну часть. Каждая часть идёт в своём
+процессе pytest со своей тестовой базой — номер части передаётся
+в TEST_DB_SUFFIX, его читает фикстура из yacommon/testing.py. В конце
+печатается вывод всех частей и время по тестовым файлам, самые
+медленные сверху.
+Код возврата — наибольший из кодов частей.
+
+Запуск из каталога проекта:
+    python ../parallel_tests.py --workers 4 [аргументы pytest]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import TemporaryDirectory
+from xml.etree import ElementTree
+
+PYTEST = [sys.executable, '-m', 'pytest']
+
+
+def collect(pytest_args):
+    """Возвращает id тестов в порядке сбора."""
+    # addopts проекта задаёт -vv, а список id печатается только при -q.
+    result = subprocess.run(
+        PYTEST + ['-o', 'addopts=', '-q', '-p', 'no:cacheprovider',
+                  '--collect-only', *pytest_args],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    if result.returncode != 0:
+        sys.stdout.write(result.stdout)
+        sys.exit(result.returncode)
+    return [line for line in result.stdout.splitlines() if '::' in line]
+
+
+def split(node_ids, workers):
+    workers = min(workers, len(node_ids))
+    return [
+        node_ids[len(node_ids) * index // workers:
+                 len(node_ids) * (index + 1) // workers]
+        for index in range(workers)
+    ]
+
+
+def run_shard(index, node_ids, pytest_args, directory):
+    report = os.path.join(directory, f'shard{index}.xml')
+    started = time.perf_counter()
+    result = subprocess.run(
+        PYTEST + [
+            '--tb=line', '-o', 'junit_family=xunit1',
+            f'--junitxml={report}', *pytest_args, *node_ids,
+        ],
+        env=dict(os.environ, TEST_DB_SUFFIX=f'shard{index}'),
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    return result, report, time.perf_counter() - started
+
+
+def file_durations(reports):
+    """{файл: секунды}; junit_family=xunit1 пишет файл каждого теста."""
+    durations = defaultdict(float)
+    for report in reports:
+        if not os.path.exists(report):
+            continue
+        for case in ElementTree.parse(report).iter('testcase'):
+            durations[case.get('file')] += float(case.get('time', 0))
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument(
+        '--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+        help='Число процессов pytest; по умолчанию половина ядер, '
+             'потому что оба проекта запускаются одновременно.'
+    )
+    options, pytest_args = parser.parse_known_args()
+    node_ids = collect(pytest_args)
+    if not node_ids:
+        print('Тесты не найдены.')
+        return 5
+    shards = split(node_ids, max(1, options.workers))
+    project = os.path.basename(os.getcwd())
+    started = time.perf_counter()
+    with TemporaryDirectory() as directory, \
+            ThreadPoolExecutor(len(shards)) as executor:
+        runs = list(executor.map(
+            lambda args: run_shard(*args, pytest_args, directory),
+            enumerate(shards, 1),
+        ))
+        durations = file_durations([report for _, report, _ in runs])
+    elapsed = time.perf_counter() - started
+    for index, (result, _, shard_elapsed) in enumerate(runs, 1):
+        print(
+            f'----- {project}: часть {index}/{len(runs)}, '
+            f'тестов {len(shards[index - 1])}, {shard_elapsed:.1f} с -----'
+        )
+        sys.stdout.write(result.stdout)
+    print(
+        f'----- {project}: время по файлам, {len(runs)} процессов, '
+        f'всего {elapsed:.1f} с -----'
+    )
+    for path, seconds in sorted(
+        durations.items(), key=lambda item: item[1], reverse=True
+    ):
+        print(f'{seconds:8.2f} с  {path}')
+    return max(result.returncode for result, _, _ in runs)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,6 +14,45 @@ print_message () {
     echo -e "${left_filler_len// /$symbol}$message${right_filler_len// /$symbol}\033[0m"
 }
 
+run_benchmarks () {
+    # Run the bench_requests command of both projects. Extra arguments
+    # (dataset sizes, --save-baseline, ...) are taken from BENCH_ARGS.
+    for project in ya_news ya_note
+    do
+        (cd "$root_dir/$project" && env -u DJANGO_SETTINGS_MODULE python manage.py bench_requests $BENCH_ARGS) 1>&2 || return $?
+    done
+}
+
+run_parallel () {
+    # Run the suite of project $1 with settings $2 split across pytest
+    # processes (see parallel_tests.py); --workers is added when given.
+    (cd "$root_dir/$1" && DJANGO_SETTINGS_MODULE=$2 python "$root_dir/parallel_tests.py" ${workers:+--workers $workers})
+}
+
+news_tests () {
+    if [[ -z "$parallel" ]]; then pytest --tb=line 1>&2; else return $news_status; fi
+}
+
+note_tests () {
+    if [[ -z "$parallel" ]]; then pytest --tb=line 1>&2; else return $note_status; fi
+}
+
+# Benchmarks are slow and opt-in: ./run_tests.sh --bench
+# Both projects at once, each split across N processes:
+# ./run_tests.sh --parallel[=N] (N defaults to half of the cores).
+root_dir=$(pwd)
+with_benchmarks=
+parallel=
+workers=
+for argument in "$@"
+do
+    case "$argument" in
+        --bench) with_benchmarks=1 ;;
+        --parallel) parallel=1 ;;
+        --parallel=*) parallel=1; workers=${argument#--parallel=} ;;
+    esac
+done
+
 
 if python -m flake8 --config=setup.cfg 1>&2;
 then
@@ -21,16 +60,39 @@ then
     echo $LF 1>&2
     if python structure_test.py
     then
+        if [[ -n "$parallel" ]]
+        then
+            logs=$(mktemp -d)
+            run_parallel ya_news "${DJANGO_SETTINGS_MODULE:-yanews.test_settings}" > "$logs/ya_news.log" 2>&1 &
+            news_pid=$!
+            run_parallel ya_note yanote.test_settings > "$logs/ya_note.log" 2>&1 &
+            note_pid=$!
+            wait $news_pid
+            news_status=$?
+            wait $note_pid
+            note_status=$?
+            cat "$logs/ya_news.log" "$logs/ya_note.log" 1>&2
+            rm -r "$logs"
+        fi
         cd ya_news
-        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.settings"}"
-        if pytest --tb=line 1>&2;
+        export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanews.test_settings"}"
+        if news_tests;
         then
             cd ../ya_note
             unset DJANGO_SETTINGS_MODULE
-            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.settings"}"
-            if pytest --tb=line 1>&2;
+            export DJANGO_SETTINGS_MODULE="${DJANGO_SETTINGS_MODULE:="yanote.test_settings"}"
+            if note_tests;
             then
-                exit 0
+                if [[ -z "$with_benchmarks" ]]; then exit 0; fi
+                if run_benchmarks
+                then
+                    print_message " Бенчмарки завершены, регрессий не обнаружено " "="
+                    exit 0
+                else
+                    status=$?
+                    print_message " Бенчмарки показали регрессию производительности или упали " "=" 1
+                    exit $status
+                fi
             else
                 status=$?
                 print_message " При запуске упали ваши тесты для проекта YaNote. Проверьте тесты этого проекта " "=" 1
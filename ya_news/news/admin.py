@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, News
+from .models import BadWord, Comment, News
 
 
 class CommentInline(admin.StackedInline):
@@ -13,3 +13,8 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+
+
+@admin.register(BadWord)
+class BadWordAdmin(admin.ModelAdmin):
+    search_fields = ('word',)
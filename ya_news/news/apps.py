@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        if settings.TEMPLATE_WARMUP:
+            from yacommon.templating import warm_up_templates
+            warm_up_templates()
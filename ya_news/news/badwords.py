@@ -0,0 +1,197 @@
+"""
+Поиск запрещённых слов в комментариях.
+
+Словарь компилируется один раз в автомат Ахо — Корасик, поэтому проверка
+текста линейна по его длине и не зависит от размера словаря. Записи
+словаря:
+
+* ``слово`` — ищется в режиме ``settings.BAD_WORDS_MODE``: ``substring``
+  (вхождение в любом месте) или ``word`` (только целое слово);
+* ``основа*`` — любое слово, начинающееся с основы (все словоформы).
+"""
+import os
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.module_loading import import_string
+
+from .models import BadWord
+
+SUBSTRING = 'substring'
+WORD = 'word'
+STEM = 'stem'
+STEM_MARK = '*'
+
+
+def normalize(text):
+    """Регистронезависимая форма текста; «ё» приравнивается к «е»."""
+    return text.casefold().replace('ё', 'е')
+
+
+def parse_entry(entry, default_mode):
+    """Возвращает нормализованный шаблон и режим поиска записи словаря."""
+    entry = normalize(entry.strip())
+    if entry.endswith(STEM_MARK):
+        return entry.rstrip(STEM_MARK), STEM
+    return entry, default_mode
+
+
+def is_boundary(text, index):
+    """Позиция index не находится внутри слова."""
+    return not (0 <= index < len(text) and text[index].isalnum())
+
+
+def fits(text, start, end, mode):
+    """Вхождение text[start:end] подходит под режим поиска."""
+    if mode == SUBSTRING:
+        return True
+    if not is_boundary(text, start - 1):
+        return False
+    return mode == STEM or is_boundary(text, end)
+
+
+class BaseMatcher:
+    """Общий интерфейс: find возвращает найденную запись или None."""
+
+    def __init__(self, entries, default_mode=SUBSTRING):
+        patterns = {}
+        for entry in entries:
+            pattern, mode = parse_entry(entry, default_mode)
+            if pattern:
+                patterns[pattern, mode] = entry
+        self.patterns = patterns
+
+    def find(self, text):
+        raise NotImplementedError
+
+
+class LinearMatcher(BaseMatcher):
+    """Проверяет каждую запись словаря по очереди: O(слов × длина)."""
+
+    def find(self, text):
+        text = normalize(text)
+        for (pattern, mode), entry in self.patterns.items():
+            start = text.find(pattern)
+            while start != -1:
+                if fits(text, start, start + len(pattern), mode):
+                    return entry
+                start = text.find(pattern, start + 1)
+        return None
+
+
+class AhoCorasickMatcher(BaseMatcher):
+    """Автомат Ахо — Корасик по всем записям словаря: O(длина текста)."""
+
+    def __init__(self, entries, default_mode=SUBSTRING):
+        super().__init__(entries, default_mode)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for key in self.patterns:
+            self._add(key)
+        self._link()
+
+    def _add(self, key):
+        node = 0
+        for char in key[0]:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = child
+        self.output[node].append(key)
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом в ширину."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] += self.output[self.fail[child]]
+
+    def find(self, text):
+        text = normalize(text)
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for pattern, mode in output[node]:
+                if fits(text, end - len(pattern), end, mode):
+                    return self.patterns[pattern, mode]
+        return None
+
+
+class Lexicon:
+    """
+    Словарь запрещённых слов с автоматической перезагрузкой.
+
+    Слова собираются из встроенного списка, файла
+    ``settings.BAD_WORDS_FILE`` и таблицы ``BadWord``. Не чаще раза
+    в ``settings.BAD_WORDS_CHECK_INTERVAL`` секунд сверяется отпечаток
+    источников (время изменения файла, число и время правки строк
+    таблицы); при его изменении матчер собирается заново без
+    перезапуска процесса.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self.matcher = None
+        self.fingerprint = None
+        self.checked_at = 0
+
+    def invalidate(self):
+        """Сбрасывает скомпилированный матчер текущего процесса."""
+        self.matcher = None
+
+    def get_fingerprint(self):
+        path = settings.BAD_WORDS_FILE
+        mtime = os.stat(path).st_mtime if path else None
+        state = BadWord.objects.aggregate(
+            total=Count('pk'), last_updated=Max('updated')
+        )
+        return mtime, state['total'], state['last_updated']
+
+    def load(self):
+        """Все записи словаря из всех источников."""
+        entries = list(self.words)
+        path = settings.BAD_WORDS_FILE
+        if path:
+            with open(path, encoding='utf-8') as lexicon_file:
+                entries += [
+                    line.strip() for line in lexicon_file
+                    if line.strip() and not line.startswith('#')
+                ]
+        entries += BadWord.objects.values_list('word', flat=True)
+        return entries
+
+    def get_matcher(self):
+        now = time.monotonic()
+        if (
+            self.matcher is None
+            or now - self.checked_at >= settings.BAD_WORDS_CHECK_INTERVAL
+        ):
+            fingerprint = self.get_fingerprint()
+            if self.matcher is None or fingerprint != self.fingerprint:
+                matcher_class = import_string(settings.BAD_WORDS_MATCHER)
+                self.matcher = matcher_class(
+                    self.load(), settings.BAD_WORDS_MODE
+                )
+                self.fingerprint = fingerprint
+            self.checked_at = now
+        return self.matcher
+
+    def find(self, text):
+        """Первая найденная в тексте запись словаря или None."""
+        return self.get_matcher().find(text)
@@ -0,0 +1,126 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Max
+
+from .models import News, NewsDeletion
+
+
+def get_user_state(request):
+    """
+    Часть валидатора, зависящая от пользователя.
+
+    Страницы авторизованного пользователя содержат его имя, форму
+    с CSRF-токеном и ссылки на правку своих комментариев, поэтому
+    их валидаторы не должны совпадать с анонимными.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return 'anonymous'
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    return f'user:{user.pk}:{user.get_username()}:{csrf_cookie}'
+
+
+def hash_parts(*parts):
+    return hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+
+
+def make_etag(request, *parts):
+    """Строит ETag страницы с учётом пользователя и параметров запроса."""
+    return hash_parts(
+        *parts, get_user_state(request), request.get_full_path()
+    )
+
+
+def latest(*moments):
+    """Наибольшее из известных времён или None."""
+    return max(filter(None, moments), default=None)
+
+
+def get_news_deleted(request):
+    """Время последнего удаления новости (см. NewsDeletion)."""
+    if not hasattr(request, '_news_deleted'):
+        request._news_deleted = NewsDeletion.objects.values_list(
+            'deleted', flat=True
+        ).first()
+    return request._news_deleted
+
+
+def get_news_list_updated(request):
+    """Время последнего изменения новостей, включая удаление.
+
+    Max('updated') берётся по индексу, а удаления, которых в таблице
+    новостей уже не видно, отмечает NewsDeletion.
+    """
+    if not hasattr(request, '_news_list_updated'):
+        request._news_list_updated = latest(
+            News.objects.aggregate(last=Max('updated'))['last'],
+            get_news_deleted(request),
+        )
+    return request._news_list_updated
+
+
+def news_list_etag(request, *args, **kwargs):
+    return make_etag(request, 'home', get_news_list_updated(request))
+
+
+def news_list_last_modified(request, *args, **kwargs):
+    if request.user.is_authenticated:
+        return None
+    return get_news_list_updated(request)
+
+
+def get_news_updated(request, pk):
+    """Время изменения новости; комментарии тоже его обновляют."""
+    if not hasattr(request, '_news_updated'):
+        request._news_updated = News.objects.filter(
+            pk=pk
+        ).values_list('updated', flat=True).first()
+    return request._news_updated
+
+
+def news_detail_etag(request, *args, **kwargs):
+    updated = get_news_updated(request, kwargs['pk'])
+    if updated is None:
+        return None
+    return make_etag(request, 'detail', kwargs['pk'], updated)
+
+
+def news_detail_last_modified(request, *args, **kwargs):
+    if request.user.is_authenticated:
+        return None
+    return get_news_updated(request, kwargs['pk'])
+
+
+def get_news_feed_state(request):
+    """
+    Состояние лент: последний id и время последней правки или удаления.
+
+    Комментарии в ленты не попадают, поэтому updated, который они
+    обновляют, здесь не учитывается. Каждый Max — отдельный запрос:
+    так SQLite берёт его из индекса, а не перебирает таблицу.
+    """
+    if not hasattr(request, '_news_feed_state'):
+        request._news_feed_state = {
+            'last_id': News.objects.aggregate(last=Max('pk'))['last'],
+            'last_modified': latest(
+                News.objects.aggregate(
+                    last=Max('content_updated')
+                )['last'],
+                get_news_deleted(request),
+            ),
+        }
+    return request._news_feed_state
+
+
+def news_feed_etag(request, *args, **kwargs):
+    """Ленты не зависят от пользователя, только от новостей и курсора."""
+    state = get_news_feed_state(request)
+    return hash_parts(
+        'feed', state['last_id'], state['last_modified'],
+        request.get_full_path()
+    )
+
+
+def news_feed_last_modified(request, *args, **kwargs):
+    return get_news_feed_state(request)['last_modified']
@@ -0,0 +1,110 @@
+"""
+Потоковые ленты новостей для партнёров: JSON и RSS 2.0.
+
+Ответ собирается по частям из ``queryset.iterator``, поэтому даже
+выгрузка всей истории не загружается в память целиком. Новости
+отдаются по возрастанию id; параметр ``since`` — id последней уже
+полученной новости, так что опрос возвращает только новые записи.
+"""
+import json
+import re
+from datetime import datetime, time
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .conditional import news_feed_etag, news_feed_last_modified
+from .models import News
+
+FEED_FIELDS = ('id', 'title', 'text', 'date')
+INVALID_SINCE = 'Параметр since должен быть id новости.'
+# str.isdigit() пропускает «²» и другие цифры Unicode, на которых int()
+# падает; 18 знаков всегда влезают в INTEGER SQLite.
+SINCE_RE = re.compile(r'[0-9]{1,18}')
+
+
+@method_decorator(
+    condition(news_feed_etag, news_feed_last_modified), name='get'
+)
+class NewsFeedBase(generic.View):
+    """Общая часть лент: выборка после курсора и потоковый ответ."""
+    content_type = None
+
+    def get_since(self):
+        since = self.request.GET.get('since', '0')
+        if not SINCE_RE.fullmatch(since):
+            raise BadRequest(INVALID_SINCE)
+        return int(since)
+
+    def get_items(self):
+        return News.objects.filter(
+            pk__gt=self.since
+        ).order_by('pk').values(*FEED_FIELDS).iterator(
+            chunk_size=settings.NEWS_FEED_CHUNK_SIZE
+        )
+
+    def get_url(self, item):
+        return self.request.build_absolute_uri(
+            reverse('news:detail', args=(item['id'],))
+        )
+
+    def stream(self, items):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        self.since = self.get_since()
+        return StreamingHttpResponse(
+            self.stream(self.get_items()), content_type=self.content_type
+        )
+
+
+class NewsFeedJSON(NewsFeedBase):
+    """Лента в JSON: {"items": [...], "next_since": id}."""
+    content_type = 'application/json'
+
+    def stream(self, items):
+        since = self.since
+        yield '{"items": ['
+        for number, item in enumerate(items):
+            since = item['id']
+            item['date'] = item['date'].isoformat()
+            item['url'] = self.get_url(item)
+            yield (',' if number else '') + json.dumps(
+                item, ensure_ascii=False
+            )
+        yield f'], "next_since": {since}}}'
+
+
+class NewsFeedRSS(NewsFeedBase):
+    """Лента в формате RSS 2.0."""
+    content_type = 'application/rss+xml; charset=utf-8'
+
+    def stream(self, items):
+        home_url = self.request.build_absolute_uri(reverse('news:home'))
+        yield (
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<rss version="2.0"><channel>'
+            '<title>YaNews</title>'
+            f'<link>{escape(home_url)}</link>'
+            '<description>Новости YaNews</description>'
+        )
+        for item in items:
+            url = escape(self.get_url(item))
+            published = format_datetime(timezone.make_aware(
+                datetime.combine(item['date'], time.min)
+            ))
+            yield (
+                f'<item><title>{escape(item["title"])}</title>'
+                f'<link>{url}</link><guid>{url}</guid>'
+                f'<pubDate>{published}</pubDate>'
+                f'<description>{escape(item["text"])}</description></item>'
+            )
+        yield '</channel></rss>'
@@ -0,0 +1,60 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from news.badwords import AhoCorasickMatcher, LinearMatcher, STEM_MARK
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость проверки комментария прежним перебором слов '
+        'и автоматом Ахо — Корасик на синтетическом словаре.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--words', type=int, default=5000)
+        parser.add_argument('--text-length', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def random_word(self, rng, min_length=4, max_length=12):
+        return ''.join(
+            rng.choice(ALPHABET)
+            for _ in range(rng.randint(min_length, max_length))
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        entries = [
+            self.random_word(rng) + (STEM_MARK if index % 3 == 0 else '')
+            for index in range(options['words'])
+        ]
+        words = []
+        while sum(map(len, words)) < options['text_length']:
+            words.append(self.random_word(rng, 2, 9))
+        text = ' '.join(words)
+        self.stdout.write(
+            f'Словарь: {len(entries)} записей, '
+            f'текст: {len(text)} символов, повторов: {options["repeat"]}'
+        )
+        results = {}
+        for matcher_class in (LinearMatcher, AhoCorasickMatcher):
+            started = timeit.default_timer()
+            matcher = matcher_class(entries, 'word')
+            build_time = timeit.default_timer() - started
+            check_time = timeit.timeit(
+                lambda: matcher.find(text), number=options['repeat']
+            ) / options['repeat']
+            results[matcher_class.__name__] = check_time
+            self.stdout.write(
+                f'{matcher_class.__name__:>20}: сборка '
+                f'{build_time * 1000:8.2f} мс, проверка '
+                f'{check_time * 1000:8.3f} мс'
+            )
+        speedup = results['LinearMatcher'] / results['AhoCorasickMatcher']
+        self.stdout.write(
+            self.style.SUCCESS(f'Ускорение проверки: {speedup:.1f}x')
+        )
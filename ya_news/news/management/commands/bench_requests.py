@@ -0,0 +1,155 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.test import override_settings
+from django.urls import reverse
+
+from news.models import Comment
+from news.seeding import PASSWORD, Seeder
+from yacommon.benchmarks import (
+    BenchmarkFailed, ClientTransport, Scenario, WSGITransport,
+    find_regressions, format_results, load_baseline, run_benchmarks,
+    save_baseline, temporary_database,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет главную, страницу новости, отправку, правку и удаление '
+        'комментария и вход на сайт через тестовый клиент и через '
+        'WSGI-сервер на временной базе заданного размера. Печатает '
+        'p50/p95/p99 и число SQL-запросов и завершается ошибкой, если '
+        'результат хуже базового JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments-per-news', type=int, default=10)
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--transport', choices=('client', 'wsgi'), action='append',
+            help='По умолчанию — оба.'
+        )
+        parser.add_argument(
+            '--baseline', default=settings.BASE_DIR / 'bench_baseline.json'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Допустимое замедление p50, доля от базового.'
+        )
+        parser.add_argument(
+            '--tail-tolerance', type=float, default=1.0,
+            help=(
+                'Допустимое замедление p95, доля от базового; хвосты '
+                'на общих машинах шумят сильнее медианы. p99 только '
+                'печатается.'
+            )
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результат как новый базовый.'
+        )
+
+    @transaction.atomic
+    def seed(self, options):
+        seeder = Seeder(options['seed'], options['batch_size'], raw=True)
+        user_ids = seeder.seed_users(options['users'])
+        news_ids = seeder.seed_news(options['news'])
+        seeder.seed_comments(
+            news_ids, user_ids, options['comments_per_news']
+        )
+        users = User.objects.filter(pk__in=user_ids).order_by('pk')
+        return list(users), news_ids
+
+    def get_scenarios(self, users, news_ids, rng):
+        author = users[0]
+        news_id = news_ids[0]
+        edited = Comment.objects.create(
+            news_id=news_id, author=author, text='Комментарий',
+            status=Comment.Status.APPROVED,
+        )
+
+        def home(index):
+            return 'get', reverse('news:home'), None
+
+        def detail(index):
+            url = reverse('news:detail', args=(rng.choice(news_ids),))
+            return 'get', url, None
+
+        def comment(index):
+            url = reverse('news:detail', args=(news_id,))
+            return 'post', url, {'text': f'Новый комментарий {index}'}
+
+        def edit(index):
+            url = reverse('news:edit', args=(edited.pk,))
+            return 'post', url, {'text': f'Правка {index}'}
+
+        def delete(index):
+            removed = Comment.objects.create(
+                news_id=news_id, author=author, text='Удалить'
+            )
+            return 'post', reverse('news:delete', args=(removed.pk,)), None
+
+        def login(index):
+            data = {'username': author.username, 'password': PASSWORD}
+            return 'post', reverse('users:login'), data
+
+        return [
+            Scenario('home', home),
+            Scenario('detail', detail),
+            Scenario('comment_post', comment, author),
+            Scenario('comment_edit', edit, author),
+            Scenario('comment_delete', delete, author),
+            Scenario('login', login),
+        ]
+
+    def handle(self, *args, **options):
+        transports = [
+            transport for transport in (ClientTransport(), WSGITransport())
+            if transport.name in (options['transport'] or ('client', 'wsgi'))
+        ]
+        aliases = (DEFAULT_DB_ALIAS, *settings.NEWS_REPLICAS)
+        with temporary_database(aliases), override_settings(
+            REQUEST_TIMING=True, QUERY_BUDGET_STRICT=False
+        ):
+            users, news_ids = self.seed(options)
+            scenarios = self.get_scenarios(
+                users, news_ids, random.Random(options['seed'])
+            )
+            try:
+                results = run_benchmarks(
+                    transports, scenarios, options['requests'],
+                    options['warmup'],
+                )
+            except BenchmarkFailed as error:
+                raise CommandError(error)
+        self.stdout.write(format_results(results))
+        self.compare(results, options)
+
+    def compare(self, results, options):
+        path = options['baseline']
+        try:
+            baseline = load_baseline(path)
+        except FileNotFoundError:
+            baseline = None
+        if baseline is None or options['save_baseline']:
+            save_baseline(path, results)
+            self.stdout.write(f'Базовый замер записан в {path}')
+            return
+        regressions = find_regressions(results, baseline, {
+            'p50': options['tolerance'], 'p95': options['tail_tolerance'],
+        })
+        if regressions:
+            raise CommandError(
+                'Хуже базового замера:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,128 @@
+import threading
+import time
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.urls import reverse
+
+from news.models import News
+
+User = get_user_model()
+
+# Прежний профиль: журнал отката, полная синхронизация, BEGIN DEFERRED
+# и новое соединение на каждый запрос.
+LEGACY_PROFILE = {
+    'CONN_MAX_AGE': 0,
+    'HEALTH_CHECKS': False,
+    'TRANSACTION_MODE': None,
+    'PRAGMAS': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+}
+PROFILE_KEYS = tuple(LEGACY_PROFILE)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает временную базу параллельными читателями (главная '
+        'и страница новости) и писателями (комментарии) и сравнивает '
+        'запросы в секунду для прежнего профиля SQLite и профиля '
+        'из настроек.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--news', type=int, default=100)
+
+    def prepare(self, directory, name, profile, news_count):
+        # Реплики смотрят в тот же файл: сравниваются только профили.
+        connections.close_all()
+        for alias in self.aliases:
+            connections.settings[alias].update(
+                profile, NAME=f'{directory}/{name}.sqlite3'
+            )
+        call_command('migrate', verbosity=0)
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Текст')
+            for index in range(news_count)
+        )
+        return [
+            User.objects.create(username=f'bench-{name}-{index}')
+            for index in range(self.writers)
+        ]
+
+    def run_client(self, deadline, counters, user=None):
+        client = Client(raise_request_exception=False, HTTP_HOST='localhost')
+        if user is not None:
+            client.force_login(user)
+        news_ids = list(News.objects.values_list('id', flat=True))
+        done = failed = 0
+        while time.monotonic() < deadline:
+            news_id = news_ids[done % len(news_ids)]
+            url = reverse('news:detail', args=(news_id,))
+            if user is not None:
+                response = client.post(url, {'text': f'Комментарий {done}'})
+            elif done % 2:
+                response = client.get(url)
+            else:
+                response = client.get(reverse('news:home'))
+            if response.status_code < 400:
+                done += 1
+            else:
+                failed += 1
+        connections.close_all()
+        counters.append((user is None, done, failed))
+
+    def measure(self, users, seconds):
+        counters = []
+        deadline = time.monotonic() + seconds
+        threads = [
+            threading.Thread(
+                target=self.run_client, args=(deadline, counters, user)
+            )
+            for user in [None] * self.readers + users
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters
+
+    def report(self, name, counters, seconds):
+        reads = sum(done for is_reader, done, _ in counters if is_reader)
+        writes = sum(done for is_reader, done, _ in counters if not is_reader)
+        failed = sum(failed for _, _, failed in counters)
+        self.stdout.write(
+            f'{name:>8}: {(reads + writes) / seconds:8.1f} запросов/с '
+            f'(чтение {reads / seconds:.1f}, запись {writes / seconds:.1f}), '
+            f'ошибок: {failed}'
+        )
+
+    def handle(self, *args, **options):
+        self.readers = options['readers']
+        self.writers = options['writers']
+        configured = settings.DATABASES[DEFAULT_DB_ALIAS]
+        tuned_profile = {key: configured.get(key) for key in PROFILE_KEYS}
+        self.aliases = (DEFAULT_DB_ALIAS, *settings.NEWS_REPLICAS)
+        originals = {
+            alias: dict(connections.settings[alias]) for alias in self.aliases
+        }
+        try:
+            with TemporaryDirectory() as directory:
+                for name, profile in (
+                    ('прежний', LEGACY_PROFILE), ('новый', tuned_profile)
+                ):
+                    users = self.prepare(
+                        directory, name, profile, options['news']
+                    )
+                    counters = self.measure(users, options['seconds'])
+                    self.report(name, counters, options['seconds'])
+        finally:
+            connections.close_all()
+            for alias, original in originals.items():
+                connections.settings[alias].update(original)
@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.moderation import ModerationWorker
+
+
+class Command(BaseCommand):
+    help = 'Разбирает очередь комментариев, ожидающих модерации.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.MODERATION_WORKERS,
+            help='Размер пула исполнителей.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.MODERATION_BATCH_SIZE,
+            help='Сколько комментариев брать из очереди за раз.'
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Использовать пул процессов вместо пула потоков.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Завершиться, когда очередь опустеет.'
+        )
+
+    def report(self, size, worker):
+        self.stdout.write(
+            f'Обработано {size} (всего {worker.processed}), '
+            f'{worker.throughput:.0f} комментариев/с'
+        )
+
+    def handle(self, *args, **options):
+        worker = ModerationWorker(
+            options['workers'],
+            options['batch_size'],
+            options['processes'],
+        )
+        try:
+            worker.run(
+                once=options['once'],
+                poll_interval=settings.MODERATION_POLL_INTERVAL,
+                report=self.report,
+            )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(
+            f'Итого: {worker.processed} комментариев, '
+            f'{worker.throughput:.0f} комментариев/с'
+        ))
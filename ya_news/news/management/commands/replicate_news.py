@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.replication import replicate
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из NEWS_REPLICAS. '
+        'С --interval повторяет копирование, пока не будет прервана.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Пауза между копированиями в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        if not settings.NEWS_REPLICAS:
+            raise CommandError(
+                'NEWS_REPLICAS пуст; реплику включает профиль '
+                'yanews.replica_settings.'
+            )
+        while True:
+            started = time.monotonic()
+            targets = replicate()
+            self.stdout.write(
+                f'Реплики {", ".join(targets)} обновлены за '
+                f'{time.monotonic() - started:.2f} с'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from news.seeding import PASSWORD, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, новостями '
+        'и комментариями. Одинаковый --seed даёт одинаковые данные; '
+        f'пароль всех пользователей — {PASSWORD}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=10_000)
+        parser.add_argument('--comments-per-news', type=int, default=100)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument(
+            '--raw', action='store_true',
+            help='Вставлять через executemany, минуя модели.'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('Нужен хотя бы один пользователь.')
+        seeder = Seeder(
+            options['seed'], options['batch_size'], options['raw']
+        )
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                user_ids = seeder.seed_users(options['users'])
+                news_ids = seeder.seed_news(options['news'])
+                seeder.seed_comments(
+                    news_ids, user_ids, options['comments_per_news']
+                )
+        except IntegrityError as error:
+            raise CommandError(
+                f'{error}. Данные с этим --seed уже загружены?'
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Вставлено строк: {seeder.rows} за {elapsed:.1f} с '
+            f'({seeder.rows / elapsed:,.0f} строк/с)'
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_comment_updated_news_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BadWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(help_text='Звёздочка в конце означает любые слова с этой основой', max_length=100, unique=True, verbose_name='Слово')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Запрещённое слово',
+                'verbose_name_plural': 'Запрещённые слова',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_badword'),
+    ]
+
+    operations = [
+        # Комментарии, опубликованные до появления модерации, одобрены.
+        migrations.AddField(
+            model_name='comment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'На модерации'), ('approved', 'Опубликован'), ('rejected', 'Отклонён')], default='approved', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'На модерации'), ('approved', 'Опубликован'), ('rejected', 'Отклонён')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['status', 'id'], name='comment_status_id_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:27
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_updated(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    News.objects.update(content_updated=F('updated'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_comment_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='content_updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copy_updated, migrations.RunPython.noop),
+    ]
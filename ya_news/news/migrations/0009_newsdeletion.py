@@ -0,0 +1,20 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0008_news_content_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0009_newsdeletion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='news',
+            name='content_updated',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
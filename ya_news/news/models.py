@@ -2,15 +2,57 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def recount_comments(self, **fields):
+        """Пересчитывает счётчик опубликованных комментариев одним
+        UPDATE-запросом; fields обновляются тем же запросом.
+        """
+        counts = Comment.objects.filter(
+            news=OuterRef('pk'), status=Comment.Status.APPROVED
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        return self.update(
+            comment_count=Coalesce(Subquery(counts), 0), **fields
+        )
+
+    def change_comment_count(self, delta):
+        """Атомарно изменяет счётчик комментариев на delta."""
+        return self.update(
+            comment_count=F('comment_count') + delta,
+            updated=timezone.now(),
+        )
+
+    def touch(self):
+        """Отмечает новости изменёнными, например после правки
+        комментария.
+        """
+        return self.update(updated=timezone.now())
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
+    # Время правки самой новости: комментарии обновляют только updated
+    # (через NewsQuerySet), а save() новости — оба поля.
+    content_updated = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -18,7 +60,30 @@ class News(models.Model):
         return self.title
 
 
+class NewsDeletion(models.Model):
+    """
+    Время последнего удаления новости; в таблице не больше одной строки.
+
+    Удаление не меняет ни Max('updated'), ни Max('id'), а считать
+    новости на каждый запрос дорого, поэтому валидаторы списков
+    берут эту отметку.
+    """
+    deleted = models.DateTimeField()
+
+    @classmethod
+    def mark(cls):
+        cls.objects.update_or_create(
+            pk=1, defaults={'deleted': timezone.now()}
+        )
+
+
 class Comment(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'На модерации'
+        APPROVED = 'approved', 'Опубликован'
+        REJECTED = 'rejected', 'Отклонён'
+
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +94,51 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_id_idx',
+            ),
+            models.Index(
+                fields=('status', 'id'),
+                name='comment_status_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает новость на момент загрузки: при переносе
+        комментария счётчик пересчитывается и у прежней новости.
+        """
+        comment = super().from_db(db, field_names, values)
+        comment._loaded_news_id = comment.__dict__.get('news_id')
+        return comment
+
+
+class BadWord(models.Model):
+    word = models.CharField(
+        'Слово',
+        max_length=100,
+        unique=True,
+        help_text='Звёздочка в конце означает любые слова с этой основой'
+    )
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Запрещённые слова'
+        verbose_name = 'Запрещённое слово'
+
+    def __str__(self):
+        return self.word
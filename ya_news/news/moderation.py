@@ -0,0 +1,139 @@
+"""
+Асинхронная модерация комментариев.
+
+Очередью служит сама таблица комментариев: новые комментарии получают
+статус «на модерации», а команда ``manage.py moderate_worker`` выбирает
+их порциями и прогоняет через проверки ``settings.MODERATION_CHECKS``
+в ограниченном пуле потоков или процессов. Проверки работают только
+с текстом и не обращаются к базе, поэтому их можно выполнять параллельно;
+решение записывается в базу основным потоком.
+"""
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .forms import LEXICON
+from .models import Comment, News
+
+LINK_PATTERN = re.compile(r'https?://|www\.', re.IGNORECASE)
+
+
+class BadWordsCheck:
+    """Отклоняет комментарии со словами из актуального словаря."""
+
+    def __init__(self):
+        self.matcher = LEXICON.get_matcher()
+
+    def __call__(self, text):
+        return self.matcher.find(text) is not None
+
+
+class LinksCheck:
+    """Отклоняет комментарии, в которых слишком много ссылок."""
+
+    def __init__(self):
+        self.max_links = settings.MODERATION_MAX_LINKS
+
+    def __call__(self, text):
+        return len(LINK_PATTERN.findall(text)) > self.max_links
+
+
+def get_checks():
+    """Готовит проверки к очередной порции комментариев."""
+    return [import_string(path)() for path in settings.MODERATION_CHECKS]
+
+
+def moderate(checks, item):
+    """Решение по одному комментарию; item — (pk, news_id, text)."""
+    pk, news_id, text = item
+    for check in checks:
+        if check(text):
+            return pk, news_id, Comment.Status.REJECTED
+    return pk, news_id, Comment.Status.APPROVED
+
+
+def apply_verdict(pk, news_id, status):
+    """
+    Сохраняет решение, если комментарий всё ещё ждёт модерации.
+
+    Условие на статус делает запись идемпотентной: несколько
+    обработчиков могут взять один комментарий, но учтён он будет
+    только один раз.
+    """
+    with transaction.atomic():
+        updated = Comment.objects.filter(
+            pk=pk, status=Comment.Status.PENDING
+        ).update(status=status, updated=timezone.now())
+        if not updated:
+            return False
+        news = News.objects.filter(pk=news_id)
+        if status == Comment.Status.APPROVED:
+            news.change_comment_count(1)
+        else:
+            news.touch()
+    return True
+
+
+class ModerationWorker:
+    """Разбирает очередь комментариев порциями в пуле исполнителей."""
+
+    def __init__(self, workers, batch_size, use_processes=False):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.executor_class = (
+            ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        )
+        self.processed = 0
+        self.elapsed = 0
+
+    @property
+    def throughput(self):
+        """Обработано комментариев в секунду за всё время работы."""
+        return self.processed / self.elapsed if self.elapsed else 0
+
+    def get_batch(self):
+        return list(
+            Comment.objects.filter(
+                status=Comment.Status.PENDING
+            ).order_by('id').values_list('pk', 'news_id', 'text')[
+                :self.batch_size
+            ]
+        )
+
+    def process_batch(self, executor):
+        """Обрабатывает одну порцию и возвращает её размер."""
+        batch = self.get_batch()
+        if not batch:
+            return 0
+        started = time.monotonic()
+        # Процессам проверки (с автоматом словаря) передаются вместе
+        # с каждой задачей: одна задача на процесс, а не на комментарий.
+        # Пул потоков chunksize не использует.
+        verdicts = executor.map(
+            partial(moderate, get_checks()), batch,
+            chunksize=-(-len(batch) // self.workers),
+        )
+        with transaction.atomic():
+            for verdict in verdicts:
+                apply_verdict(*verdict)
+        self.elapsed += time.monotonic() - started
+        self.processed += len(batch)
+        return len(batch)
+
+    def run(self, once=False, poll_interval=1, report=None):
+        """Разбирает очередь; с once=True — только до её опустошения."""
+        with self.executor_class(max_workers=self.workers) as executor:
+            while True:
+                size = self.process_batch(executor)
+                if size and report:
+                    report(size, self)
+                if not size:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
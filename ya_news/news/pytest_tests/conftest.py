@@ -6,7 +6,11 @@ from django.urls import reverse
 from django.utils import timezone
 from django.test.client import Client
 
-from news.models import News, Comment
+from news.forms import LEXICON
+from news.models import BadWord, News, Comment
+from yacommon.testing import (  # noqa: F401
+    clear_caches, django_db_modify_db_settings, strict_query_budget,
+)
 
 
 @pytest.fixture
@@ -61,17 +65,32 @@ def comment(news, author):
     comment = Comment.objects.create(
         news=news,
         author=author,
-        text='Текст'
+        text='Текст',
+        status=Comment.Status.APPROVED,
     )
     return comment
 
 
 @pytest.fixture
 def all_comments(news, author):
-    for index in range(10):
-        Comment.objects.create(
+    """Десять опубликованных комментариев одной вставкой; bulk_create
+    не шлёт сигналы, поэтому счётчик новости пересчитывается явно.
+    """
+    Comment.objects.bulk_create(
+        Comment(
             news=news, author=author, text=f'Tекст {index}',
+            status=Comment.Status.APPROVED,
         )
+        for index in range(10)
+    )
+    News.objects.filter(pk=news.pk).recount_comments()
+
+
+@pytest.fixture
+def bad_word():
+    bad_word = BadWord.objects.create(word='злод*')
+    yield bad_word
+    LEXICON.invalidate()
 
 
 @pytest.fixture
@@ -91,6 +110,11 @@ def detail_url(news):
     return reverse('news:detail', args=(news.id,))
 
 
+@pytest.fixture
+def comments_url(news):
+    return reverse('news:comments', args=(news.id,))
+
+
 @pytest.fixture
 def delete_comment_url(comment):
     return reverse('news:delete', args=(comment.id,))
@@ -101,6 +125,16 @@ def edit_comment_url(comment):
     return reverse('news:edit', args=(comment.id,))
 
 
+@pytest.fixture
+def feed_json_url():
+    return reverse('news:feed_json')
+
+
+@pytest.fixture
+def rss_url():
+    return reverse('news:rss')
+
+
 @pytest.fixture
 def login_url():
     return reverse('users:login')
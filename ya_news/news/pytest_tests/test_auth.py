@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from yacommon.auth import USER_KEY, get_cache
+
+pytestmark = pytest.mark.django_db
+
+
+def test_warm_cache_skips_session_and_user_queries(author_client, home_url):
+    """Сессия живёт в cookie, а пользователь после первого запроса
+    берётся из кеша: к django_session и auth_user запросов нет.
+    """
+    requests = []
+    for _ in range(2):
+        with CaptureQueriesContext(connection) as queries:
+            response = author_client.get(home_url)
+        assert response.wsgi_request.user.is_authenticated
+        requests.append([query['sql'] for query in queries])
+    cold, warm = (
+        [sql for sql in queries if 'auth_user' in sql or 'session' in sql]
+        for queries in requests
+    )
+    assert len(cold) == 1
+    assert warm == []
+
+
+def test_cached_user_invalidation(author, author_client, home_url, logout_url):
+    """Сохранение пользователя и выход сбрасывают запись в кеше,
+    после смены пароля сессия перестаёт действовать.
+    """
+    key = USER_KEY.format(user_id=author.pk)
+    author_client.get(home_url)
+    author.first_name = 'Новое имя'
+    author.save()
+    response = author_client.get(home_url)
+    assert response.wsgi_request.user.first_name == 'Новое имя'
+    author_client.get(logout_url)
+    assert get_cache().get(key) is None
+    author_client.force_login(author)
+    author_client.get(home_url)
+    assert get_cache().get(key) is not None
+    author.set_password('новый пароль')
+    author.save()
+    response = author_client.get(home_url)
+    assert not response.wsgi_request.user.is_authenticated
@@ -0,0 +1,17 @@
+from yacommon.benchmarks import find_regressions
+
+
+def test_benchmark_regressions():
+    """Лишний SQL-запрос — всегда регрессия, время — сверх допуска."""
+    baseline = {'client': {'home': {'p50': 10, 'p95': 20, 'queries': 2}}}
+    results = {'client': {
+        'home': {'p50': 14, 'p95': 50, 'queries': 3},
+        'detail': {'p50': 100, 'p95': 100, 'queries': 9},
+    }}
+    regressions = find_regressions(results, baseline, {'p50': 0.5})
+    assert len(regressions) == 1
+    assert 'client/home: SQL-запросов 3' in regressions[0]
+    regressions = find_regressions(
+        results, baseline, {'p50': 0.25, 'p95': 1}
+    )
+    assert len(regressions) == 3
@@ -1,7 +1,15 @@
+import base64
+import json
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
 
 from news.forms import CommentForm
+from news.models import News
+
+HOME_URL = pytest.lazy_fixture('home_url')
+COMMENTS_URL = pytest.lazy_fixture('comments_url')
 
 pytestmark = pytest.mark.django_db
 
@@ -10,10 +18,20 @@ def test_news_count(client, all_news, home_url):
     """Количество новостей на главной странице не больше 10."""
     response = client.get(home_url)
     object_list = response.context['object_list']
-    news_count = object_list.count()
+    news_count = len(object_list)
     assert news_count == settings.NEWS_COUNT_ON_HOME_PAGE
 
 
+def test_home_page_queries(
+        client, all_news, all_comments, home_url, django_assert_num_queries
+):
+    """Число запросов главной страницы не зависит от числа комментариев:
+    два запроса по индексу для валидаторов и один для самих новостей.
+    """
+    with django_assert_num_queries(3):
+        client.get(home_url)
+
+
 def test_news_order(client, home_url, all_news):
     """Новости отсортированы от самой новой к самой старой."""
     response = client.get(home_url)
@@ -23,17 +41,108 @@ def test_news_order(client, home_url, all_news):
     assert sorted_dates == all_dates
 
 
+def test_news_archive_pages(client, all_news, home_url):
+    """По курсору открываются более старые новости и обратно."""
+    first_page = client.get(home_url).context['page_obj']
+    assert not first_page.has_previous()
+    response = client.get(home_url, {'cursor': first_page.next_cursor})
+    second_page = response.context['page_obj']
+    assert len(second_page) == 1
+    assert not second_page.has_next()
+    assert second_page.object_list[0].date < first_page.object_list[-1].date
+    response = client.get(home_url, {'cursor': second_page.previous_cursor})
+    back_page = response.context['page_obj']
+    assert back_page.object_list == first_page.object_list
+    assert back_page.has_next()
+
+
+def make_token(*items):
+    """Курсор с произвольным содержимым, как у подделанного."""
+    return base64.urlsafe_b64encode(json.dumps(items).encode()).decode()
+
+
+@pytest.mark.parametrize('url', (HOME_URL, COMMENTS_URL))
+@pytest.mark.parametrize(
+    'cursor',
+    (
+        'испорчен',
+        make_token('n', ['a'], '1'),
+        make_token('n', {'a': 1}, '1'),
+        make_token('n', None, None),
+    )
+)
+def test_invalid_cursor(client, url, cursor):
+    """Испорченный или подделанный курсор приводит к ошибке 400."""
+    response = client.get(url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    'url, first_key',
+    (
+        (HOME_URL, '2020-01-01'),
+        (COMMENTS_URL, '2020-01-01T00:00:00+00:00'),
+    )
+)
+def test_cursor_id_out_of_range(client, url, first_key):
+    """id, который не помещается в целое SQLite, — тоже ошибка 400."""
+    cursor = make_token('n', first_key, str(10 ** 30))
+    response = client.get(url, {'cursor': cursor})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_feed_json_since(client, all_news, feed_json_url):
+    """Лента JSON отдаёт все новости, а с курсором since — только
+    добавленные после него.
+    """
+    feed = json.loads(b''.join(client.get(feed_json_url).streaming_content))
+    assert len(feed['items']) == News.objects.count()
+    assert feed['next_since'] == News.objects.latest('pk').pk
+    news = News.objects.create(title='Свежая новость', text='Текст')
+    response = client.get(feed_json_url, {'since': feed['next_since']})
+    feed = json.loads(b''.join(response.streaming_content))
+    assert [item['id'] for item in feed['items']] == [news.pk]
+    assert feed['next_since'] == news.pk
+
+
+def test_rss_items(client, all_news, rss_url):
+    """В ленте RSS есть все новости."""
+    response = client.get(rss_url)
+    content = b''.join(response.streaming_content).decode()
+    assert content.count('<item>') == News.objects.count()
+
+
 def test_comments_order(client, detail_url, all_comments):
     """Комментарии отсортированы от самого старого к самому новому."""
     response = client.get(detail_url)
     assert 'news' in response.context
-    news = response.context['news']
-    all_comments = news.comment_set.all()
+    all_comments = response.context['comments']
     all_timestamps = [comment.created for comment in all_comments]
     sorted_timestamps = sorted(all_timestamps)
     assert all_timestamps == sorted_timestamps
 
 
+def test_comments_paginated(
+        client, settings, detail_url, comments_url, all_comments
+):
+    """Комментарии выводятся порциями, следующая порция отдаётся
+    отдельным HTML-фрагментом.
+    """
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 3
+    first_page = client.get(detail_url).context['comments']
+    assert len(first_page) == 3
+    assert first_page.has_next()
+    response = client.get(comments_url, {'cursor': first_page.next_cursor})
+    assert response.status_code == HTTPStatus.OK
+    assert 'news' not in response.context
+    second_page = response.context['comments']
+    assert len(second_page) == 3
+    assert second_page.object_list[0].created >= (
+        first_page.object_list[-1].created
+    )
+    assert not set(first_page.object_list) & set(second_page.object_list)
+
+
 def test_anonymous_client_has_no_form(client, detail_url):
     """Анонимному пользователю недоступна форма для отправки
     комментария на странице отдельной новости.
@@ -49,3 +158,10 @@ def test_authorized_client_has_form(author_client, detail_url):
     response = author_client.get(detail_url)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.parametrize('since', ('²', '-1', '١', str(10 ** 30)))
+def test_feed_invalid_since(client, feed_json_url, since):
+    """Параметр since — только неотрицательный id из ASCII-цифр, иначе 400."""
+    response = client.get(feed_json_url, {'since': since})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
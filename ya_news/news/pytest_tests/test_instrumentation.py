@@ -0,0 +1,36 @@
+from http import HTTPStatus
+
+import pytest
+
+from news.views import NewsList
+from yacommon.instrumentation import QueryBudgetExceeded
+
+pytestmark = pytest.mark.django_db
+
+
+def test_server_timing_header(author_client, detail_url):
+    """Каждый ответ несёт замеры запроса в заголовке Server-Timing."""
+    response = author_client.get(detail_url)
+    timing = response['Server-Timing']
+    for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'view;dur='):
+        assert metric in timing
+
+
+def test_server_timing_templates(client, home_url):
+    """Время отрисовки разбито по шаблонам, включая {% include %}."""
+    timing = client.get(home_url)['Server-Timing']
+    assert 'tpl-part;dur=' in timing
+    for name in ('news/home.html', 'includes/header.html'):
+        assert f'desc="{name}"' in timing
+
+
+def test_query_budget(monkeypatch, settings, caplog, client, home_url):
+    """В тестах превышение бюджета — ошибка, в работе — предупреждение."""
+    monkeypatch.setattr(NewsList, 'query_budget', 0)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(home_url)
+    settings.QUERY_BUDGET_STRICT = False
+    response = client.get(home_url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'news.views.NewsList' in caplog.records[-1].getMessage()
+    assert caplog.records[-1].levelname == 'WARNING'
@@ -1,10 +1,17 @@
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.core.management import CommandError, call_command
 from pytest_django.asserts import assertRedirects, assertFormError
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.forms import BAD_WORDS, LEXICON, WARNING
+from news.models import Comment, News
+
+DETAIL_URL = pytest.lazy_fixture('detail_url')
+EDIT_COMMENT_URL = pytest.lazy_fixture('edit_comment_url')
+DELETE_COMMENT_URL = pytest.lazy_fixture('delete_comment_url')
+FORM_DATA = pytest.lazy_fixture('form_data')
 
 pytestmark = pytest.mark.django_db
 
@@ -22,6 +29,43 @@ def test_user_can_create_comment(
     assert comment.text == form_data['text']
     assert comment.news == news
     assert comment.author == author
+    assert comment.status == Comment.Status.PENDING
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.parametrize(
+    'text, expected_status',
+    (
+        ('Новый текст', Comment.Status.APPROVED),
+        ('http://a.ru http://b.ru http://c.ru', Comment.Status.REJECTED),
+    )
+)
+def test_moderation_worker(
+        author_client, news, detail_url, text, expected_status
+):
+    """Обработчик очереди публикует или отклоняет комментарии
+    и учитывает в счётчике только опубликованные.
+    """
+    author_client.post(detail_url, data={'text': text})
+    call_command('moderate_worker', '--once', stdout=StringIO())
+    comment = Comment.objects.get()
+    assert comment.status == expected_status
+    news.refresh_from_db()
+    assert news.comment_count == int(
+        expected_status == Comment.Status.APPROVED
+    )
+
+
+def test_pending_comment_visible_only_to_author(
+        author_client, not_author_client, form_data, detail_url
+):
+    """Комментарий на модерации виден только его автору."""
+    author_client.post(detail_url, data=form_data)
+    author_comments = author_client.get(detail_url).context['comments']
+    assert len(author_comments) == 1
+    other_comments = not_author_client.get(detail_url).context['comments']
+    assert len(other_comments) == 0
 
 
 def test_anonymous_user_cant_create_comment(
@@ -48,8 +92,26 @@ def test_user_cant_use_bad_words(author_client, detail_url):
     assert comments_count_before == comments_count_after
 
 
+@pytest.mark.parametrize(
+    'text',
+    (
+        f'Какой-то текст, {BAD_WORDS[0].upper()}, еще текст',
+        'Какой-то текст, ЗЛОДЕЙСКИЙ умысел',
+    )
+)
+@pytest.mark.usefixtures('bad_word')
+def test_bad_words_case_and_stems(author_client, detail_url, text):
+    """Запрещённые слова ищутся без учёта регистра, а слова из таблицы
+    BadWord со звёздочкой — во всех словоформах.
+    """
+    comments_count_before = Comment.objects.count()
+    response = author_client.post(detail_url, data={'text': text})
+    assertFormError(response, 'form', 'text', errors=WARNING)
+    assert Comment.objects.count() == comments_count_before
+
+
 def test_author_can_delete_comment(
-        author_client, delete_comment_url, detail_url
+        author_client, delete_comment_url, detail_url, news
 ):
     """Автор может удалить свой комментарий."""
     comments_count_before = Comment.objects.count()
@@ -57,6 +119,8 @@ def test_author_can_delete_comment(
     assertRedirects(response, f'{detail_url}#comments')
     comments_count_after = Comment.objects.count()
     assert comments_count_before - 1 == comments_count_after
+    news.refresh_from_db()
+    assert news.comment_count == comments_count_after
 
 
 def test_user_cant_delete_comment_of_another_user(
@@ -86,6 +150,25 @@ def test_author_can_edit_comment(
     assert edited_comment.created == comment.created
 
 
+def test_edited_comment_is_moderated_again(
+        author_client, news, comment, edit_comment_url
+):
+    """Правка опубликованного комментария снимает его с публикации
+    до решения модерации, как и новый комментарий.
+    """
+    text = 'http://a.ru http://b.ru http://c.ru http://d.ru'
+    author_client.post(edit_comment_url, {'text': text})
+    comment.refresh_from_db()
+    assert comment.status == Comment.Status.PENDING
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    call_command('moderate_worker', '--once', stdout=StringIO())
+    comment.refresh_from_db()
+    assert comment.status == Comment.Status.REJECTED
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
 def test_user_cant_edit_comment_of_another_user(
         not_author_client, form_data, comment, edit_comment_url
 ):
@@ -100,3 +183,77 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment.news == comment_from_db.news
     assert comment.author == comment_from_db.author
     assert comment.created == comment_from_db.created
+
+
+def test_moved_comment_recounts_both_news(comment):
+    """Перенос комментария к другой новости (например, в админке)
+    исправляет счётчики у обеих новостей.
+    """
+    other_news = News.objects.create(title='Другая', text='Текст')
+    moved = Comment.objects.get(pk=comment.pk)
+    moved.news = other_news
+    moved.save()
+    assert News.objects.get(pk=comment.news_id).comment_count == 0
+    assert News.objects.get(pk=other_news.pk).comment_count == 1
+
+
+def test_recount_comments_command(news, all_comments):
+    """Команда recount_comments восстанавливает счётчики комментариев."""
+    News.objects.update(comment_count=0)
+    call_command('recount_comments', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == Comment.objects.filter(
+        news=news, status=Comment.Status.APPROVED
+    ).count()
+
+
+def test_seed_scale_command(django_user_model):
+    """Одинаковый seed даёт одинаковые данные в обоих режимах вставки,
+    счётчики комментариев сходятся, повторная загрузка — ошибка.
+    """
+    options = {'news': 5, 'comments_per_news': 4, 'users': 3}
+    snapshots = []
+    for raw in (True, False):
+        call_command('seed_scale', raw=raw, stdout=StringIO(), **options)
+        assert News.objects.count() == 5
+        for news in News.objects.all():
+            assert news.comment_count == news.comment_set.filter(
+                status=Comment.Status.APPROVED
+            ).count()
+        snapshots.append(list(Comment.objects.order_by('pk').values_list(
+            'news__title', 'author__username', 'text', 'status', 'created'
+        )))
+        if not raw:
+            continue
+        with pytest.raises(CommandError):
+            call_command('seed_scale', raw=raw, **options)
+        News.objects.all().delete()
+        django_user_model.objects.all().delete()
+    assert len(snapshots[0]) == 20
+    assert [row[:4] for row in snapshots[0]] == [
+        row[:4] for row in snapshots[1]
+    ]
+
+
+@pytest.mark.parametrize(
+    'method, url, data, expected_queries',
+    (
+        ('post', DETAIL_URL, FORM_DATA, 6),
+        ('get', EDIT_COMMENT_URL, None, 2),
+        ('post', EDIT_COMMENT_URL, FORM_DATA, 4),
+        ('get', DELETE_COMMENT_URL, None, 2),
+        ('post', DELETE_COMMENT_URL, None, 4),
+    )
+)
+def test_comment_flows_query_count(
+        author_client, django_assert_num_queries,
+        method, url, data, expected_queries
+):
+    """Число запросов к базе в сценариях работы с комментариями
+    зафиксировано, чтобы повторные выборки объекта не вернулись.
+    Сессия живёт в cookie; пользователь после входа читается из базы
+    один раз.
+    """
+    LEXICON.get_matcher()
+    with django_assert_num_queries(expected_queries):
+        getattr(author_client, method)(url, data=data)
@@ -0,0 +1,68 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from news.models import News
+from news.replication import copy_database
+from news.routers import (
+    PIN_COOKIE, ReadYourWritesMiddleware, ReplicaChooser, ReplicaRouter,
+)
+from yacommon.sqlite.base import DatabaseWrapper
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_reads_stick_to_primary_after_write(
+        author_client, news, detail_url, form_data
+):
+    """Чтение идёт с реплики, а после комментария пользователь
+    читает с основной базы.
+    """
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        author_client.get(detail_url)
+    assert len(replica_queries) > 0
+    response = author_client.post(detail_url, data=form_data)
+    assert PIN_COOKIE in response.cookies
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        response = author_client.get(detail_url)
+    assert len(replica_queries) == 0
+    assert len(response.context['comments']) == 1
+
+
+def test_reads_use_default_without_replicas(settings, rf):
+    """Без реплик (как в settings.py) чтение идёт с основной базы."""
+    settings.NEWS_REPLICAS = {}
+    router = ReplicaRouter()
+    middleware = ReadYourWritesMiddleware(
+        lambda request: router.db_for_read(News)
+    )
+    assert middleware(rf.get('/')) == DEFAULT_DB_ALIAS
+
+
+def test_replica_chooser():
+    chooser = ReplicaChooser({'first': 2, 'second': 1}, 'round_robin')
+    assert [chooser.choose() for _ in range(6)] == [
+        'first', 'first', 'second', 'first', 'first', 'second'
+    ]
+    chooser = ReplicaChooser({'first': 1, 'second': 0}, 'weighted')
+    assert {chooser.choose() for _ in range(20)} == {'first'}
+
+
+def test_copy_database(tmp_path):
+    primary, replica = (
+        DatabaseWrapper(
+            {**connection.settings_dict, 'NAME': tmp_path / f'{alias}.db'},
+            alias=alias,
+        )
+        for alias in ('primary', 'replica')
+    )
+    with primary.cursor() as cursor:
+        cursor.execute('CREATE TABLE news (title TEXT)')
+        cursor.execute("INSERT INTO news VALUES ('Заголовок')")
+    copy_database(primary, replica)
+    with replica.cursor() as cursor:
+        cursor.execute('SELECT title FROM news')
+        assert cursor.fetchall() == [('Заголовок',)]
+    primary.close()
+    replica.close()
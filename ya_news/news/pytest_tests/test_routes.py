@@ -1,11 +1,19 @@
+from datetime import timedelta
 from http import HTTPStatus
 
 import pytest
 from django.test.client import Client
+from django.urls import reverse
+from django.utils import timezone
 from pytest_django.asserts import assertRedirects
 
+from news.models import News
+
 HOME_URL = pytest.lazy_fixture('home_url')
 DETAIL_URL = pytest.lazy_fixture('detail_url')
+COMMENTS_URL = pytest.lazy_fixture('comments_url')
+FEED_JSON_URL = pytest.lazy_fixture('feed_json_url')
+RSS_URL = pytest.lazy_fixture('rss_url')
 LOGIN_URL = pytest.lazy_fixture('login_url')
 LOGOUT_URL = pytest.lazy_fixture('logout_url')
 SIGN_UP_URL = pytest.lazy_fixture('sign_up_url')
@@ -24,6 +32,9 @@ pytestmark = pytest.mark.django_db
     (
         (HOME_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
         (DETAIL_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
+        (COMMENTS_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
+        (FEED_JSON_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
+        (RSS_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
         (LOGIN_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
         (LOGOUT_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
         (SIGN_UP_URL, ANONYMOUS_CLINET, HTTPStatus.OK),
@@ -36,6 +47,8 @@ pytestmark = pytest.mark.django_db
 def test_pages_availability(url, parametrized_client, expected_status):
     """Главная страница доступна анонимному пользователю;
     Страница отдельной новости доступна анонимному пользователю;
+    Фрагмент со списком комментариев доступен анонимному пользователю;
+    Ленты JSON и RSS доступны анонимному пользователю;
     Страницы удаления и редактирования комментария доступны автору комментария;
     Авторизованный пользователь не может зайти на страницы редактирования
     или удаления чужих комментариев;
@@ -46,6 +59,13 @@ def test_pages_availability(url, parametrized_client, expected_status):
     assert response.status_code == expected_status
 
 
+@pytest.mark.parametrize('name', ('news:detail', 'news:comments'))
+def test_missing_news_not_found(client, news, name):
+    """Страница и фрагмент комментариев несуществующей новости — 404."""
+    response = client.get(reverse(name, args=(news.pk + 1,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 @pytest.mark.parametrize(
     'url',
     (EDIT_COMMENT_URL, DELETE_COMMENT_URL)
@@ -57,3 +77,82 @@ def test_redirects(client, url, login_url):
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, DETAIL_URL, FEED_JSON_URL, RSS_URL)
+)
+@pytest.mark.usefixtures('news')
+def test_conditional_get(client, url):
+    """Повторный запрос с If-None-Match или If-Modified-Since
+    получает ответ 304 без тела.
+    """
+    response = client.get(url)
+    for header, value in (
+        ('HTTP_IF_NONE_MATCH', response['ETag']),
+        ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+    ):
+        response = client.get(url, **{header: value})
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert not response.content
+
+
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, FEED_JSON_URL, RSS_URL)
+)
+def test_deleted_news_invalidates_conditional_get(client, url, news):
+    """После удаления новости ни ETag, ни Last-Modified списка и лент
+    не подходят, хотя максимум времени изменения от удаления не меняется.
+    """
+    News.objects.create(title='Другая новость', text='Текст')
+    yesterday = timezone.now() - timedelta(days=1)
+    News.objects.update(updated=yesterday, content_updated=yesterday)
+    response = client.get(url)
+    news.delete()
+    for header, value in (
+        ('HTTP_IF_NONE_MATCH', response['ETag']),
+        ('HTTP_IF_MODIFIED_SINCE', response['Last-Modified']),
+    ):
+        response = client.get(url, **{header: value})
+        assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize(
+    'url',
+    (HOME_URL, DETAIL_URL)
+)
+def test_conditional_get_depends_on_user(client, author_client, url):
+    """Валидаторы анонимной страницы не подходят авторизованному
+    пользователю, а Last-Modified для него не отдаётся.
+    """
+    anonymous_etag = client.get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=anonymous_etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != anonymous_etag
+    assert not response.has_header('Last-Modified')
+
+
+def test_new_comment_changes_etag(author_client, detail_url, comment):
+    """После нового комментария старый ETag больше не подходит."""
+    etag = author_client.get(detail_url)['ETag']
+    author_client.post(detail_url, data={'text': 'Ещё комментарий'})
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_feed_etag_ignores_comments(
+    author_client, client, feed_json_url, detail_url, news
+):
+    """Комментарии в ленту не попадают и её валидаторы не меняют,
+    а правка новости — меняет.
+    """
+    etag = client.get(feed_json_url)['ETag']
+    author_client.post(detail_url, data={'text': 'Ещё комментарий'})
+    response = client.get(feed_json_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(feed_json_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,45 @@
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+
+from yacommon.sqlite.base import DatabaseWrapper
+
+pytestmark = pytest.mark.django_db
+
+
+def test_sqlite_connection_profile(tmp_path):
+    """Новое соединение получает PRAGMA из настроек, а сломанное
+    постоянное соединение при проверке открывается заново.
+    """
+    wrapper = DatabaseWrapper(
+        {**connection.settings_dict, 'NAME': tmp_path / 'db.sqlite3'},
+        alias='profile',
+    )
+    wrapper.ensure_connection()
+    pragmas = {
+        name: wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+        for name in ('journal_mode', 'synchronous', 'busy_timeout')
+    }
+    assert pragmas == {'journal_mode': 'wal', 'synchronous': 1,
+                       'busy_timeout': 5000}
+    wrapper.connection.close()
+    assert not wrapper.is_usable()
+    wrapper.close_if_unusable_or_obsolete()
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        assert cursor.fetchone() == (1,)
+    wrapper.close()
+
+
+def test_schema_snapshot():
+    """Тестовая база скопирована из снимка со всеми миграциями."""
+    with closing(sqlite3.connect(
+        connection.creation.get_snapshot_path()
+    )) as snapshot:
+        applied = snapshot.execute(
+            'SELECT COUNT(*) FROM django_migrations'
+        ).fetchone()[0]
+    assert applied == MigrationRecorder(connection).migration_qs.count()
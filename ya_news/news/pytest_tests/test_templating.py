@@ -0,0 +1,38 @@
+import pytest
+
+from news.models import News
+from yacommon.templating import warm_up_templates
+
+pytestmark = pytest.mark.django_db
+
+
+def test_fragment_cache(settings, author, client, author_client, news,
+                        home_url):
+    """Шапка кешируется для каждого пользователя отдельно, карточка
+    новости — до её изменения.
+    """
+    settings.CACHES = {
+        **settings.CACHES,
+        'template_fragments': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'template-fragments',
+        },
+    }
+    assert 'Войти' in client.get(home_url).content.decode()
+    content = author_client.get(home_url).content.decode()
+    assert author.username in content
+    assert 'Войти' not in content
+    # update() без поля updated не меняет ключ: карточка из кеша.
+    News.objects.filter(pk=news.pk).update(title='Не виден')
+    assert 'Не виден' not in client.get(home_url).content.decode()
+    author.username = 'Новое имя'
+    author.save()
+    news.title = 'Новый заголовок'
+    news.save()
+    content = author_client.get(home_url).content.decode()
+    assert 'Новое имя' in content
+    assert 'Новый заголовок' in content
+
+
+def test_warm_up_templates():
+    assert warm_up_templates() > 0
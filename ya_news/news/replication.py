@@ -0,0 +1,24 @@
+"""
+Репликация SQLite для локальной проверки маршрутизации чтения.
+
+Основная база копируется в файлы реплик через backup API SQLite:
+копия согласована на момент начала копирования, а читатели реплики
+лишь ненадолго ждут блокировку (busy_timeout).
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, target):
+    """Копирует базу соединения source в базу соединения target."""
+    source.ensure_connection()
+    target.ensure_connection()
+    source.connection.backup(target.connection)
+
+
+def replicate(source=DEFAULT_DB_ALIAS, targets=None):
+    """Копирует основную базу во все реплики; возвращает их имена."""
+    targets = list(settings.NEWS_REPLICAS if targets is None else targets)
+    for alias in targets:
+        copy_database(connections[source], connections[alias])
+    return targets
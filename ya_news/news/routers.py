@@ -0,0 +1,115 @@
+"""
+Маршрутизация чтения новостей и комментариев на реплики.
+
+Чтение News и Comment внутри HTTP-запроса уходит на одну из реплик из
+NEWS_REPLICAS, запись — всегда на основную базу. После записи чтение
+этого пользователя на NEWS_READ_YOUR_WRITES_SECONDS секунд закрепляется
+за основной базой (см. ReadYourWritesMiddleware), чтобы он сразу видел
+свой комментарий, даже если реплика ещё не догнала основную базу.
+Вне запросов (команды, фоновые задачи) всё читается с основной базы.
+"""
+import itertools
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'news_pinned_until'
+ROUTED_MODELS = ('news.news', 'news.comment')
+
+_state = ContextVar('news_replica_state', default=None)
+
+
+class RequestState:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+class ReplicaChooser:
+    """Выбор реплики: случайный по весам или по кругу с учётом весов."""
+
+    def __init__(self, weights, strategy):
+        self.aliases = list(weights)
+        self.weights = list(weights.values())
+        self.strategy = strategy
+        self._cycle = itertools.cycle([
+            alias for alias, weight in weights.items()
+            for _ in range(weight)
+        ])
+        self._lock = threading.Lock()
+
+    def choose(self):
+        if self.strategy == 'round_robin':
+            with self._lock:
+                return next(self._cycle)
+        return random.choices(self.aliases, self.weights)[0]
+
+
+class ReplicaRouter:
+
+    def __init__(self):
+        self.chooser = ReplicaChooser(
+            settings.NEWS_REPLICAS, settings.NEWS_REPLICA_STRATEGY
+        )
+
+    def is_routed(self, model):
+        return model._meta.label_lower in ROUTED_MODELS
+
+    def db_for_read(self, model, **hints):
+        if not self.is_routed(model):
+            return None
+        state = _state.get()
+        if (
+            state is None
+            or state.pinned
+            or not self.chooser.aliases
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return self.chooser.choose()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and self.is_routed(model):
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема попадает на реплики вместе с данными при репликации.
+        if db in settings.NEWS_REPLICAS:
+            return False
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """Закрепляет чтение за основной базой после записи пользователя."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        state = RequestState(pinned=pinned_until > time.time())
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote:
+            window = settings.NEWS_READ_YOUR_WRITES_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + window), max_age=window,
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .forms import LEXICON
+from .models import BadWord, Comment, News, NewsDeletion
+
+from yacommon.auth import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw=False, **kwargs):
+    """
+    Опубликованный комментарий увеличивает счётчик у новости.
+
+    Любое другое сохранение (новый комментарий на модерации, правка,
+    смена статуса или новости в админке) пересчитывает счётчик этой
+    новости, а при переносе — и прежней, и обновляет время их изменения.
+    """
+    if raw:
+        return
+    news = News.objects.filter(pk=instance.news_id)
+    previous_news_id = getattr(instance, '_loaded_news_id', None)
+    instance._loaded_news_id = instance.news_id
+    if created and instance.status == Comment.Status.APPROVED:
+        news.change_comment_count(1)
+        return
+    if created:
+        news.touch()
+        return
+    if previous_news_id not in (None, instance.news_id):
+        news = News.objects.filter(
+            pk__in=(instance.news_id, previous_news_id)
+        )
+    news.recount_comments(updated=timezone.now())
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """Удалённый опубликованный комментарий уменьшает счётчик у новости."""
+    news = News.objects.filter(pk=instance.news_id)
+    if instance.status != Comment.Status.APPROVED or not news.filter(
+        comment_count__gt=0
+    ).change_comment_count(-1):
+        news.touch()
+
+
+@receiver(post_delete, sender=News)
+def mark_news_deletion(sender, instance, **kwargs):
+    """Удаление новости меняет валидаторы главной страницы и лент."""
+    NewsDeletion.mark()
+
+
+@receiver(post_save, sender=BadWord)
+@receiver(post_delete, sender=BadWord)
+def reload_lexicon(sender, **kwargs):
+    """Изменение словаря сразу применяется в текущем процессе."""
+    LEXICON.invalidate()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Изменённый пользователь, в том числе со сменой пароля, читается
+    из базы заново.
+    """
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -1,16 +1,23 @@
 from django.urls import path
 
-from news import views
+from news import feeds, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('feed.json', feeds.NewsFeedJSON.as_view(), name='feed_json'),
+    path('rss.xml', feeds.NewsFeedRSS.as_view(), name='rss'),
 ]
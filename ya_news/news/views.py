@@ -1,38 +1,81 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .conditional import (
+    news_detail_etag, news_detail_last_modified,
+    news_list_etag, news_list_last_modified,
+)
 from .forms import CommentForm
 from .models import Comment, News
 
+from yacommon.mixins import CachedObjectMixin
+from yacommon.pagination import KeysetPaginationMixin, KeysetPaginator
 
-class NewsList(generic.ListView):
-    """Список новостей."""
+
+@method_decorator(
+    condition(news_list_etag, news_list_last_modified), name='get'
+)
+class NewsList(KeysetPaginationMixin, generic.ListView):
+    """Список новостей с переходом к более старым."""
     model = News
     template_name = 'news/home.html'
+    keyset_ordering = ('-date', '-id')
+    # Наибольшее число SQL-запросов за запрос, включая сессию
+    # и пользователя (см. instrumentation).
+    query_budget = 4
 
-    def get_queryset(self):
+    def get_paginate_by(self, queryset):
         """
-        Выводим только несколько последних новостей.
+        Выводим только несколько последних новостей на странице.
 
         Их количество определяется в настройках проекта.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return settings.NEWS_COUNT_ON_HOME_PAGE
+
+
+def get_comments_page(request, news_id):
+    """
+    Одна порция комментариев к новости, начиная с курсора.
+
+    Видны опубликованные комментарии и собственные комментарии
+    пользователя, ожидающие модерации.
+    """
+    visible = Q(status=Comment.Status.APPROVED)
+    if request.user.is_authenticated:
+        visible |= Q(status=Comment.Status.PENDING, author=request.user)
+    paginator = KeysetPaginator(
+        Comment.objects.filter(visible, news_id=news_id).select_related(
+            'author'
+        ),
+        ('created', 'id'),
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+    )
+    return paginator.page(request.GET.get('cursor'))
+
 
+class CommentPageMixin:
+    """Добавляет в контекст страницу комментариев к новости."""
 
-class NewsDetail(generic.DetailView):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = get_comments_page(self.request, self.object.pk)
+        return context
+
+
+class NewsDetail(CommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -42,8 +85,28 @@ class NewsDetail(generic.DetailView):
         return context
 
 
+class NewsComments(generic.TemplateView):
+    """Следующая порция комментариев в виде HTML-фрагмента."""
+    template_name = 'news/comments.html'
+    query_budget = 3
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        comments = get_comments_page(self.request, self.kwargs['pk'])
+        # Пустая порция и у новости без комментариев, и у несуществующей;
+        # лишний запрос только в этом случае.
+        if not comments.object_list and not News.objects.filter(
+            pk=self.kwargs['pk']
+        ).exists():
+            raise Http404
+        context['comments'] = comments
+        return context
+
+
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
+        CachedObjectMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -59,7 +122,8 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -68,37 +132,51 @@ class NewsComment(
 
 
 class NewsDetailView(generic.View):
+    detail_view = staticmethod(NewsDetail.as_view())
+    comment_view = staticmethod(NewsComment.as_view())
+    query_budget = 9
 
+    @method_decorator(condition(news_detail_etag, news_detail_last_modified))
     def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+        return self.detail_view(request, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+        return self.comment_view(request, *args, **kwargs)
 
 
-class CommentBase(LoginRequiredMixin):
+class CommentBase(LoginRequiredMixin, CachedObjectMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
         comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': comment.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
     """Редактирование комментария."""
     template_name = 'news/edit.html'
     form_class = CommentForm
+    query_budget = 7
+
+    def form_valid(self, form):
+        """Изменённый текст снова уходит на модерацию; счётчик новости
+        пересчитывает сигнал post_save.
+        """
+        if 'text' in form.changed_data:
+            form.instance.status = Comment.Status.PENDING
+        return super().form_valid(form)
 
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+    query_budget = 6
@@ -0,0 +1,39 @@
+"""
+Продакшен-профиль шаблонов: скомпилированные шаблоны хранятся в памяти
+процесса (cached.Loader) и прогреваются при старте, шапка и карточки
+новостей кешируются фрагментами. Остальные настройки — из settings.py.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, CACHES
+
+DEBUG = False
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'yacommon.templating.fragment_cache',
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+CACHES['template_fragments'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    # Своё хранилище: иначе locmem делит его с кешем default.
+    'LOCATION': 'template-fragments',
+    'OPTIONS': {'MAX_ENTRIES': 10_000},
+}
+
+TEMPLATE_WARMUP = True
@@ -0,0 +1,19 @@
+"""
+Профиль с репликой для чтения новостей и комментариев (см. news/routers.py).
+
+Реплика — копия основной базы, которую обновляет команда replicate_news;
+миграции её не создают. Перед первым запуском с этим профилем:
+    python manage.py migrate
+    python manage.py replicate_news
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, DATABASES
+
+# В тестах реплика — зеркало default.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'db_replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+NEWS_REPLICAS = {'replica': 1}
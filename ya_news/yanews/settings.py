@@ -1,9 +1,13 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий код ya_news и ya_note — пакет yacommon в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-7)dgs++2!#==aye4rd=5)c)bw0eokiyqx0hts6#t80!$c&$s+('
 
 DEBUG = True
@@ -21,11 +25,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'news.routers.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -43,6 +49,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'yacommon.templating.fragment_cache',
             ],
         },
     },
@@ -51,13 +58,50 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# Настройки PRAGMAS, TRANSACTION_MODE и HEALTH_CHECKS описаны
+# в yacommon/sqlite/base.py.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yacommon.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'HEALTH_CHECKS': True,
+        'TRANSACTION_MODE': 'IMMEDIATE',
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -20000,
+        },
     }
 }
 
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Тег {% cache %} пишет в этот кеш. DummyCache ничего не хранит:
+    # при разработке правки шаблонов видны сразу.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+# Сессия хранится в подписанной cookie: ни чтения, ни записи в базу.
+SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+# Пользователь сессии читается через кеш (см. yacommon/auth.py);
+# AUTH_USER_CACHE_TIMEOUT = 0 отключает кеш. Кеш по умолчанию — locmem,
+# сброс записей виден только в своём процессе, поэтому срок жизни
+# короткий.
+AUTHENTICATION_BACKENDS = ['yacommon.auth.CachedModelBackend']
+
+AUTH_USER_CACHE_ALIAS = 'default'
+
+AUTH_USER_CACHE_TIMEOUT = 60
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -80,3 +124,66 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+NEWS_FEED_CHUNK_SIZE = 500
+
+BAD_WORDS_MATCHER = 'news.badwords.AhoCorasickMatcher'
+
+BAD_WORDS_MODE = 'substring'
+
+BAD_WORDS_FILE = None
+
+BAD_WORDS_CHECK_INTERVAL = 60
+
+MODERATION_CHECKS = [
+    'news.moderation.BadWordsCheck',
+    'news.moderation.LinksCheck',
+]
+
+MODERATION_MAX_LINKS = 2
+
+MODERATION_WORKERS = 4
+
+MODERATION_BATCH_SIZE = 100
+
+MODERATION_POLL_INTERVAL = 1
+
+# Реплики для чтения и их веса; стратегия выбора: weighted или round_robin.
+# Без реплик всё читается с основной базы; реплика включается профилем
+# yanews/replica_settings.py.
+NEWS_REPLICAS = {}
+
+NEWS_REPLICA_STRATEGY = 'weighted'
+
+# Сколько секунд после записи пользователь читает с основной базы.
+NEWS_READ_YOUR_WRITES_SECONDS = 5
+
+# Срок жизни фрагментов {% cache %}, секунды, и прогрев шаблонов при
+# старте процесса. Кеш фрагментов и прогрев включаются
+# в yanews/production_settings.py.
+TEMPLATE_FRAGMENT_CACHE_TIMEOUT = 300
+
+TEMPLATE_WARMUP = False
+
+# Замеры запросов: заголовок Server-Timing и строка журнала на запрос.
+REQUEST_TIMING = True
+
+# Превышение query_budget представления: False — предупреждение
+# в журнале, True — исключение (включается в тестах).
+QUERY_BUDGET_STRICT = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yacommon.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -0,0 +1,19 @@
+"""
+Настройки для тестов: база в памяти, схема которой копируется из
+снимка вместо прогона миграций (см. yacommon/sqlite/creation.py),
+и быстрый хешер паролей. Основа — профиль с репликой, чтобы тесты
+проверяли и маршрутизацию чтения.
+"""
+from pathlib import Path
+from tempfile import gettempdir
+
+from .replica_settings import *  # noqa: F401, F403
+from .replica_settings import DATABASES
+
+# NAME не задан: Django создаёт базу SQLite в памяти, у каждого процесса
+# свою. Снимок один на все процессы и все прогоны.
+DATABASES['default']['TEST'] = {
+    'SNAPSHOT': Path(gettempdir()) / 'yanews-test-snapshots',
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,104 @@
+"""
+Кеш списков и страниц заметок с версией на каждого автора.
+
+Ключи записей включают номер версии автора. Любое изменение его заметок
+увеличивает версию, и старые записи просто перестают читаться — без
+перебора ключей и без удаления. Устаревшие записи вытесняет сам бэкенд
+по таймауту.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'notes:version:{author_id}'
+ENTRY_KEY = 'notes:{author_id}:{kind}:{key}'
+MISSING = object()
+
+
+class CacheStats:
+    """Счётчики попаданий и промахов кеша заметок в текущем процессе."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+STATS = CacheStats()
+
+
+def get_cache():
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def get_version(author_id):
+    """Текущая версия заметок автора."""
+    cache = get_cache()
+    key = VERSION_KEY.format(author_id=author_id)
+    version = cache.get(key)
+    if version is None:
+        # Начальная версия уникальна: если ключ версии вытеснят,
+        # записи со старыми номерами не станут снова видимыми.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def bump_version(author_id):
+    """Делает недействительными все записи кеша автора за O(1)."""
+    cache = get_cache()
+    key = VERSION_KEY.format(author_id=author_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(author_id):
+    """
+    Сбрасывает кеш автора сразу и ещё раз после коммита транзакции.
+
+    Второй сброс не даёт параллельному запросу закешировать под новой
+    версией данные, прочитанные до коммита.
+    """
+    bump_version(author_id)
+    transaction.on_commit(lambda: bump_version(author_id))
+
+
+def get_or_compute(author_id, kind, key, compute):
+    """Возвращает запись кеша автора или вычисляет и сохраняет её."""
+    cache = get_cache()
+    version = get_version(author_id)
+    entry_key = ENTRY_KEY.format(author_id=author_id, kind=kind, key=key)
+    value = cache.get(entry_key, MISSING, version=version)
+    if value is not MISSING:
+        STATS.record(hit=True)
+        return value
+    STATS.record(hit=False)
+    value = compute()
+    cache.set(
+        entry_key, value, settings.NOTES_CACHE_TIMEOUT, version=version
+    )
+    return value
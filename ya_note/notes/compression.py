@@ -0,0 +1,132 @@
+"""
+Сжатие текстов заметок.
+
+Текст хранится в BLOB: первый байт — маркер способа хранения, дальше
+данные. Короткие тексты и тексты, которые не ужимаются, хранятся как
+UTF-8 без сжатия, длинные — через zlib или lzma.
+"""
+import lzma
+import zlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+
+RAW = b'\x00'
+ZLIB = b'\x01'
+LZMA = b'\x02'
+COMPRESSORS = {
+    'zlib': (ZLIB, zlib.compress),
+    'lzma': (LZMA, lzma.compress),
+}
+DECOMPRESSORS = {
+    RAW: bytes,
+    ZLIB: zlib.decompress,
+    LZMA: lzma.decompress,
+}
+
+
+def encode(text, method=None, min_size=None):
+    """Хранимое значение для текста."""
+    method = method or settings.NOTES_COMPRESSION
+    if min_size is None:
+        min_size = settings.NOTES_COMPRESSION_MIN_SIZE
+    data = text.encode()
+    if len(data) >= min_size:
+        marker, compress = COMPRESSORS[method]
+        packed = compress(data)
+        if len(packed) < len(data):
+            return marker + packed
+    return RAW + data
+
+
+def decode(value):
+    """Текст из хранимого значения; строки, записанные до сжатия, как есть."""
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    return DECOMPRESSORS[value[:1]](value[1:]).decode()
+
+
+def stored_size(value):
+    if isinstance(value, str):
+        return len(value.encode())
+    return len(value)
+
+
+class CompressedText:
+    """Прочитанное из базы значение, которое ещё не распаковано."""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return decode(self.data)
+
+    def __eq__(self, other):
+        if isinstance(other, CompressedText):
+            return self.data == other.data
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.data)
+
+
+@dataclass
+class Savings:
+    rows: int = 0
+    changed: int = 0
+    size_before: int = 0
+    size_after: int = 0
+
+    @property
+    def saved(self):
+        return self.size_before - self.size_after
+
+    def __str__(self):
+        ratio = self.size_after / self.size_before if self.size_before else 1
+        return (
+            f'Заметок: {self.rows}, перезаписано: {self.changed}, '
+            f'было {self.size_before} байт, стало {self.size_after} байт '
+            f'({ratio:.1%}), сэкономлено {self.saved} байт'
+        )
+
+
+def rewrite_texts(connection, table, convert, batch_size=None):
+    """
+    Перезаписывает тексты всех заметок пачками по batch_size строк.
+
+    convert получает текст и возвращает новое хранимое значение
+    (encode — сжать, тождественная функция — распаковать в строку).
+    Каждая пачка — отдельная транзакция; работает на сыром SQL, чтобы
+    подходить и для миграций, и для команды compress_notes.
+    """
+    batch_size = batch_size or settings.NOTES_TRANSFER_BATCH_SIZE
+    quoted = connection.ops.quote_name(table)
+    select_sql = (
+        f'SELECT id, text FROM {quoted} WHERE id > %s ORDER BY id LIMIT %s'
+    )
+    update_sql = f'UPDATE {quoted} SET text = %s WHERE id = %s'
+    savings = Savings()
+    last_id = 0
+    while True:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(select_sql, (last_id, batch_size))
+                rows = cursor.fetchall()
+                if not rows:
+                    return savings
+                updates = []
+                for note_id, value in rows:
+                    new_value = convert(decode(value))
+                    savings.size_before += stored_size(value)
+                    savings.size_after += stored_size(new_value)
+                    if new_value != value:
+                        if isinstance(new_value, bytes):
+                            new_value = connection.Database.Binary(new_value)
+                        updates.append((new_value, note_id))
+                cursor.executemany(update_sql, updates)
+        savings.rows += len(rows)
+        savings.changed += len(updates)
+        last_id = rows[-1][0]
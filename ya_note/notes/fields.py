@@ -0,0 +1,57 @@
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .compression import CompressedText, encode
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Распаковывает текст при первом обращении к атрибуту модели."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedText):
+            value = instance.__dict__[self.field.attname] = str(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Текстовое поле, которое хранится в BLOB и сжимается,
+    если текст длиннее NOTES_COMPRESSION_MIN_SIZE байт.
+
+    Из базы приходит нераспакованное значение; распаковка происходит
+    при обращении к атрибуту. Если текст не трогали, при сохранении
+    в базу уходят те же байты без повторного сжатия. Поиск по вхождению
+    (contains, icontains) для такого поля не работает.
+    """
+    descriptor_class = CompressedTextDescriptor
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, str):
+            return value
+        return CompressedText(bytes(value))
+
+    def to_python(self, value):
+        if isinstance(value, CompressedText):
+            return str(value)
+        return super().to_python(value)
+
+    def pre_save(self, model_instance, add):
+        return model_instance.__dict__.get(self.attname)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        if isinstance(value, CompressedText):
+            data = value.data
+        else:
+            data = encode(self.to_python(value))
+        return connection.Database.Binary(data)
@@ -0,0 +1,73 @@
+import statistics
+import timeit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from notes.markup import RENDER_CACHE
+from notes.models import Note
+
+User = get_user_model()
+SECTION = (
+    '## Раздел {index}\n\n'
+    'Обычный абзац с **жирным**, *курсивом*, `кодом` и '
+    '[ссылкой](https://example.com/{index}).\n\n'
+    '* первый пункт\n* второй пункт\n* третий пункт\n\n'
+    '```\nprint({index})\n```\n\n'
+    '| колонка | значение |\n|---|---|\n| {index} | {index} |\n\n'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время ответа страницы заметки с большим текстом '
+        'в Markdown при холодном и тёплом кеше отрисовки. Данные '
+        'создаются в транзакции, которая в конце откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100 * 1024,
+                            help='Размер текста заметки в байтах.')
+        parser.add_argument('--requests', type=int, default=50)
+
+    def make_text(self, size):
+        sections = []
+        length = 0
+        while length < size:
+            section = SECTION.format(index=len(sections))
+            sections.append(section)
+            length += len(section.encode())
+        return ''.join(sections)
+
+    def measure(self, client, url, requests, cold):
+        timings = []
+        for _ in range(requests):
+            if cold:
+                RENDER_CACHE.clear()
+            started = timeit.default_timer()
+            client.get(url)
+            timings.append(timeit.default_timer() - started)
+        return timings
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            author = User.objects.create(username='bench-markdown')
+            note = Note.objects.create(
+                title='Markdown', text=self.make_text(options['size']),
+                author=author,
+            )
+            client = Client()
+            client.force_login(author)
+            url = reverse('notes:detail', args=(note.slug,))
+            client.get(url)
+            for name, cold in (('холодный', True), ('тёплый', False)):
+                timings = self.measure(client, url, options['requests'], cold)
+                self.stdout.write(
+                    f'{name:>9}: медиана '
+                    f'{statistics.median(timings) * 1000:8.2f} мс, '
+                    f'максимум {max(timings) * 1000:8.2f} мс'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,135 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.test import override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from notes.seeding import PASSWORD, Seeder
+from yacommon.benchmarks import (
+    BenchmarkFailed, ClientTransport, Scenario, WSGITransport,
+    find_regressions, format_results, load_baseline, run_benchmarks,
+    save_baseline, temporary_database,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет список заметок, страницу заметки, создание заметки '
+        'и вход на сайт через тестовый клиент и через WSGI-сервер '
+        'на временной базе заданного размера. Печатает p50/p95/p99 '
+        'и число SQL-запросов и завершается ошибкой, если результат '
+        'хуже базового JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2)
+        parser.add_argument('--notes-per-user', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--transport', choices=('client', 'wsgi'), action='append',
+            help='По умолчанию — оба.'
+        )
+        parser.add_argument(
+            '--baseline', default=settings.BASE_DIR / 'bench_baseline.json'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.5,
+            help='Допустимое замедление p50, доля от базового.'
+        )
+        parser.add_argument(
+            '--tail-tolerance', type=float, default=1.0,
+            help=(
+                'Допустимое замедление p95, доля от базового; хвосты '
+                'на общих машинах шумят сильнее медианы. p99 только '
+                'печатается.'
+            )
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результат как новый базовый.'
+        )
+
+    @transaction.atomic
+    def seed(self, options):
+        seeder = Seeder(options['seed'], options['batch_size'], raw=True)
+        user_ids = seeder.seed_users(options['users'])
+        seeder.seed_notes(user_ids, options['notes_per_user'])
+        return list(User.objects.filter(pk__in=user_ids).order_by('pk'))
+
+    def get_scenarios(self, users, rng):
+        author = users[0]
+        slugs = list(
+            Note.objects.filter(author=author).values_list('slug', flat=True)
+        )
+
+        def notes_list(index):
+            return 'get', reverse('notes:list'), None
+
+        def detail(index):
+            url = reverse('notes:detail', args=(rng.choice(slugs),))
+            return 'get', url, None
+
+        def create(index):
+            data = {'title': f'Новая заметка {index}', 'text': 'Текст'}
+            return 'post', reverse('notes:add'), data
+
+        def login(index):
+            data = {'username': author.username, 'password': PASSWORD}
+            return 'post', reverse('users:login'), data
+
+        return [
+            Scenario('notes_list', notes_list, author),
+            Scenario('note_detail', detail, author),
+            Scenario('note_create', create, author),
+            Scenario('login', login),
+        ]
+
+    def handle(self, *args, **options):
+        transports = [
+            transport for transport in (ClientTransport(), WSGITransport())
+            if transport.name in (options['transport'] or ('client', 'wsgi'))
+        ]
+        with temporary_database((DEFAULT_DB_ALIAS,)), override_settings(
+            REQUEST_TIMING=True, QUERY_BUDGET_STRICT=False
+        ):
+            users = self.seed(options)
+            scenarios = self.get_scenarios(
+                users, random.Random(options['seed'])
+            )
+            try:
+                results = run_benchmarks(
+                    transports, scenarios, options['requests'],
+                    options['warmup'],
+                )
+            except BenchmarkFailed as error:
+                raise CommandError(error)
+        self.stdout.write(format_results(results))
+        self.compare(results, options)
+
+    def compare(self, results, options):
+        path = options['baseline']
+        try:
+            baseline = load_baseline(path)
+        except FileNotFoundError:
+            baseline = None
+        if baseline is None or options['save_baseline']:
+            save_baseline(path, results)
+            self.stdout.write(f'Базовый замер записан в {path}')
+            return
+        regressions = find_regressions(results, baseline, {
+            'p50': options['tolerance'], 'p95': options['tail_tolerance'],
+        })
+        if regressions:
+            raise CommandError(
+                'Хуже базового замера:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
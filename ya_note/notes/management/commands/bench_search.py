@@ -0,0 +1,83 @@
+import random
+import timeit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import get_terms, search_fallback, search_fts
+
+ALPHABET = 'абвгдежзиклмнопрстуфхцчшэюя'
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу FTS5 и поиск по вхождению '
+        'на синтетических заметках. Данные создаются в транзакции, '
+        'которая в конце откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--vocabulary', type=int, default=20_000)
+        parser.add_argument('--words-per-note', type=int, default=40)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def make_vocabulary(self, rng, size):
+        return [
+            ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(3, 10)))
+            for _ in range(size)
+        ]
+
+    def seed(self, rng, users, vocabulary, options):
+        words = options['words_per_note']
+        batch = []
+        for index in range(options['notes']):
+            batch.append(Note(
+                title=' '.join(rng.choices(vocabulary, k=3)),
+                text=' '.join(rng.choices(vocabulary, k=words)),
+                slug=f'bench-{index}',
+                author=users[index % len(users)],
+            ))
+            if len(batch) == options['batch_size']:
+                Note.objects.bulk_create(batch)
+                batch = []
+        Note.objects.bulk_create(batch)
+
+    def measure(self, search, users, queries, rng):
+        def run():
+            for query in queries:
+                search(rng.choice(users), get_terms(query), 50)
+        return timeit.timeit(run, number=1) / len(queries)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary = self.make_vocabulary(rng, options['vocabulary'])
+        queries = [
+            ' '.join(rng.sample(vocabulary, 2))[:-2]
+            for _ in range(options['queries'])
+        ]
+        with transaction.atomic():
+            users = [
+                User.objects.create(username=f'bench-search-{index}')
+                for index in range(options['users'])
+            ]
+            started = timeit.default_timer()
+            self.seed(rng, users, vocabulary, options)
+            self.stdout.write(
+                f'Создано {options["notes"]} заметок за '
+                f'{timeit.default_timer() - started:.1f} с'
+            )
+            for name, search in (
+                ('FTS5', search_fts), ('Scan', search_fallback)
+            ):
+                per_query = self.measure(search, users, queries, rng)
+                self.stdout.write(
+                    f'{name:>5}: {per_query * 1000:9.2f} мс на запрос'
+                )
+            transaction.set_rollback(True)
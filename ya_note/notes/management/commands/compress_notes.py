@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from notes.compression import encode, rewrite_texts
+from notes.models import Note
+
+
+class Command(BaseCommand):
+    help = (
+        'Перезаписывает тексты заметок с текущими настройками сжатия '
+        '(NOTES_COMPRESSION, NOTES_COMPRESSION_MIN_SIZE) и сообщает, '
+        'сколько места сэкономлено.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='Выполнить VACUUM, чтобы файл SQLite уменьшился на диске.'
+        )
+
+    def handle(self, *args, **options):
+        savings = rewrite_texts(
+            connection, Note._meta.db_table, encode, options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(str(savings)))
+        if options['vacuum'] and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.models import Note
+from notes.transfer import export_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в формате JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Имя автора.')
+        parser.add_argument(
+            '--output', help='Путь к файлу; по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int)
+
+    def write(self, output, lines):
+        count = 0
+        for line in lines:
+            output.write(line)
+            count += 1
+        return count
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["user"]} не найден.')
+        lines = export_notes(
+            Note.objects.filter(author=author), options['chunk_size']
+        )
+        started = time.monotonic()
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                count = self.write(output, lines)
+        else:
+            count = self.write(self.stdout, lines)
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено заметок: {count}, '
+            f'{count / elapsed if elapsed else 0:.0f} строк/с'
+        )
@@ -0,0 +1,34 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import import_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки пользователя из файла JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument('--user', required=True, help='Имя автора.')
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["user"]} не найден.')
+        if options['path'] == '-':
+            result = import_notes(sys.stdin, author, options['batch_size'])
+        else:
+            with open(options['path'], encoding='utf-8') as lines:
+                result = import_notes(lines, author, options['batch_size'])
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано заметок: {result.created}, с ошибками: '
+            f'{result.failed}, {result.rate:.0f} строк/с'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notes.revisions import get_notes_to_prune, prune_revisions
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет старые версии заметок, оставляя у каждой заметки '
+        'заданное число последних версий.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=50)
+
+    def handle(self, *args, **options):
+        keep = options['keep']
+        if keep < 1:
+            raise CommandError('--keep должен быть не меньше 1.')
+        notes = deleted = 0
+        for note_id in get_notes_to_prune(keep).iterator():
+            with transaction.atomic():
+                deleted += prune_revisions(note_id, keep)
+            notes += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Заметок: {notes}, удалено версий: {deleted}'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит индекс полнотекстового поиска заново, например после '
+        'правок заметок в обход Django.'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_index(Note.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Заметок в индексе: {Note.objects.count()}'
+        ))
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.seeding import PASSWORD, Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями и заметками. '
+        'Одинаковый --seed даёт одинаковые данные; пароль всех '
+        f'пользователей — {PASSWORD}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--notes-per-user', type=int, default=100_000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument(
+            '--raw', action='store_true',
+            help='Вставлять через executemany, минуя модели.'
+        )
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            options['seed'], options['batch_size'], options['raw']
+        )
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                user_ids = seeder.seed_users(options['users'])
+                seeder.seed_notes(user_ids, options['notes_per_user'])
+        except IntegrityError as error:
+            raise CommandError(
+                f'{error}. Данные с этим --seed уже загружены?'
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Вставлено строк: {seeder.rows} за {elapsed:.1f} с '
+            f'({seeder.rows / elapsed:,.0f} строк/с)'
+        )
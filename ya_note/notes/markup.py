@@ -0,0 +1,117 @@
+"""
+Отрисовка текстов заметок из Markdown в HTML.
+
+Готовый HTML хранится в LRU-кеше процесса по хешу текста: повторный
+показ неизменённой заметки не запускает разбор заново, а при правке
+текста меняется ключ. Размер кеша ограничен суммарной длиной HTML.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from html import unescape
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+SAFE_SCHEMES = ('http', 'https', 'mailto')
+URL_ATTRIBUTES = ('href', 'src')
+# Браузер сам раскрывает сущности и выбрасывает пробелы и управляющие
+# символы, поэтому схема ищется в уже очищенной строке.
+IGNORED_IN_URL = re.compile(r'[\x00-\x20]')
+SCHEME = re.compile(r'([^/?#]*):')
+
+
+def is_safe_url(url):
+    match = SCHEME.match(IGNORED_IN_URL.sub('', unescape(url)))
+    return match is None or match.group(1).lower() in SAFE_SCHEMES
+
+
+class SafeLinksTreeprocessor(Treeprocessor):
+    """Убирает ссылки со схемами вроде javascript:."""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in URL_ATTRIBUTES:
+                url = element.get(attribute)
+                if url is not None and not is_safe_url(url):
+                    del element.attrib[attribute]
+
+
+class SafeExtension(Extension):
+    """Сырой HTML в тексте выводится как текст, а не как разметка."""
+
+    def extendMarkdown(self, md):  # noqa: N802
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        # После всех обработчиков, включая возврат экранированных символов.
+        md.treeprocessors.register(
+            SafeLinksTreeprocessor(md), 'safe_links', -10
+        )
+
+
+class RenderCache:
+    """LRU-кеш готового HTML, ограниченный суммарной длиной записей."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def set(self, key, html):
+        if len(html) > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = html
+            self.size += len(html)
+            while self.size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+RENDER_CACHE = RenderCache(settings.NOTES_MARKDOWN_CACHE_SIZE)
+_local = threading.local()
+
+
+def get_renderer():
+    """Экземпляр Markdown не потокобезопасен: у каждого потока свой."""
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = _local.renderer = markdown.Markdown(
+            extensions=[*EXTENSIONS, SafeExtension()]
+        )
+    return renderer
+
+
+def render_markdown(text):
+    """HTML для текста заметки; повторно текст не разбирается."""
+    key = hashlib.sha256(text.encode()).digest()
+    html = RENDER_CACHE.get(key)
+    if html is None:
+        html = get_renderer().reset().convert(text)
+        RENDER_CACHE.set(key, html)
+    return mark_safe(html)
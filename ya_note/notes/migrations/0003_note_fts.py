@@ -0,0 +1,67 @@
+from django.db import migrations
+
+FTS_TABLE = 'notes_note_fts'
+
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, text
+    ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+)
+
+
+def run_on_sqlite(statements):
+    """Индекс FTS5 есть только в SQLite; на других СУБД поиск
+    работает без него.
+    """
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
@@ -0,0 +1,28 @@
+from importlib import import_module
+
+from django.db import migrations
+
+import notes.fields
+
+fts = import_module('notes.migrations.0003_note_fts')
+
+
+class Migration(migrations.Migration):
+    """Текст заметки переезжает в BLOB; старый индекс FTS5 читал
+    столбец напрямую, поэтому он удаляется и создаётся заново в 0005.
+    """
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fts.run_on_sqlite(fts.DROP_SQL), fts.run_on_sqlite(fts.CREATE_SQL)
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+    ]
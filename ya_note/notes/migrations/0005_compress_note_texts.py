@@ -0,0 +1,83 @@
+from importlib import import_module
+
+from django.db import migrations
+
+from notes.compression import encode, rewrite_texts
+
+fts = import_module('notes.migrations.0003_note_fts')
+
+FTS_TABLE = 'notes_note_fts'
+PLAIN_VIEW = 'notes_note_plain'
+
+# Индекс читает распакованный текст через представление и функцию
+# notes_text, которую регистрирует notes.signals при подключении.
+# Функции нет вне Django, и с этими триггерами любая запись
+# в notes_note из другого клиента падает: 0007 заменяет их индексацией
+# из Python.
+CREATE_SQL = (
+    f"""
+    CREATE VIEW {PLAIN_VIEW} AS
+    SELECT id, title, notes_text(text) AS text FROM notes_note
+    """,
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        content='{PLAIN_VIEW}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_text(new.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_text(old.text));
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, text
+    ON notes_note BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, notes_text(old.text));
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, notes_text(new.text));
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+DROP_SQL = (
+    *fts.DROP_SQL,
+    f'DROP VIEW IF EXISTS {PLAIN_VIEW}',
+)
+
+
+def rewrite(convert):
+    def run(apps, schema_editor):
+        rewrite_texts(
+            schema_editor.connection,
+            apps.get_model('notes', 'Note')._meta.db_table,
+            convert,
+        )
+    return run
+
+
+class Migration(migrations.Migration):
+    """Сжимает тексты существующих заметок пачками до создания индекса,
+    чтобы триггеры FTS5 не срабатывали на каждую перезапись.
+    """
+
+    dependencies = [
+        ('notes', '0004_compressed_note_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite(encode), rewrite(str)),
+        migrations.RunPython(
+            fts.run_on_sqlite(CREATE_SQL), fts.run_on_sqlite(DROP_SQL)
+        ),
+    ]
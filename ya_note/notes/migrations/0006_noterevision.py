@@ -0,0 +1,53 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:17
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+import notes.fields
+
+
+def snapshot_existing_notes(apps, schema_editor):
+    """Первая версия каждой заметки — копия текущего текста;
+    сжатые данные копируются в базе без распаковки.
+    """
+    quote = schema_editor.connection.ops.quote_name
+    notes = apps.get_model('notes', 'Note')._meta.db_table
+    revisions = apps.get_model('notes', 'NoteRevision')._meta.db_table
+    schema_editor.execute(
+        f'INSERT INTO {quote(revisions)} '
+        '(note_id, number, created, title, is_snapshot, data) '
+        f'SELECT id, 1, %s, title, %s, text FROM {quote(notes)}',
+        (timezone.now(), True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_compress_note_texts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер версии')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('title', models.CharField(max_length=100, verbose_name='Заголовок')),
+                ('is_snapshot', models.BooleanField(default=False, verbose_name='Полная копия')),
+                ('data', notes.fields.CompressedTextField(verbose_name='Текст или изменения')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+            options={
+                'ordering': ('note', '-number'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='noterevision',
+            constraint=models.UniqueConstraint(fields=('note', 'number'), name='note_revision_number_unique'),
+        ),
+        migrations.RunPython(
+            snapshot_existing_notes, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,72 @@
+from importlib import import_module
+
+from django.db import migrations
+
+from notes.compression import decode
+
+fts = import_module('notes.migrations.0003_note_fts')
+compressed = import_module('notes.migrations.0005_compress_note_texts')
+
+FTS_TABLE = 'notes_note_fts'
+BATCH_SIZE = 1000
+
+# Индекс хранит распакованный текст сам и заполняется из Python
+# (см. notes.search). Ни триггеров, ни функций Python в схеме нет:
+# писать в notes_note можно любым клиентом SQLite.
+CREATE_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, text,
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+)
+
+
+def create_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    for statement in compressed.DROP_SQL + CREATE_SQL:
+        schema_editor.execute(statement)
+    notes = apps.get_model('notes', 'Note')._meta.db_table
+    insert_sql = (
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text) VALUES (%s, %s, %s)'
+    )
+    last_id = 0
+    with connection.cursor() as cursor:
+        while True:
+            cursor.execute(
+                f'SELECT id, title, text FROM {notes} '
+                'WHERE id > %s ORDER BY id LIMIT %s', (last_id, BATCH_SIZE)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(insert_sql, [
+                (note_id, title, decode(text))
+                for note_id, title, text in rows
+            ])
+            last_id = rows[-1][0]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    for statement in compressed.CREATE_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """Индекс FTS5 без триггеров: они вызывали notes_text, которой
+    нет у других клиентов SQLite.
+    """
+
+    dependencies = [
+        ('notes', '0006_noterevision'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, restore_triggers),
+    ]
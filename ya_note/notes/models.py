@@ -1,7 +1,8 @@
 from django.conf import settings
 from django.db import models
 
-from pytils.translit import slugify
+from .fields import CompressedTextField
+from .slugs import save_with_slug
 
 
 class Note(models.Model):
@@ -11,7 +12,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -28,11 +29,45 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        if self.slug:
+            return super().save(*args, **kwargs)
+        return save_with_slug(self, lambda: super(Note, self).save(
+            *args, **kwargs
+        ))
+
+
+class NoteRevision(models.Model):
+    """
+    Версия заметки: полная копия текста или изменения
+    относительно предыдущей версии (см. notes.revisions).
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    number = models.PositiveIntegerField('Номер версии')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    title = models.CharField('Заголовок', max_length=100)
+    is_snapshot = models.BooleanField('Полная копия', default=False)
+    data = CompressedTextField('Текст или изменения')
+
+    class Meta:
+        ordering = ('note', '-number')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}: версия {self.number}'
@@ -0,0 +1,170 @@
+"""
+История заметок: периодические полные копии и изменения между ними.
+
+Каждая K-я версия (NOTES_REVISION_SNAPSHOT_EVERY) хранится целиком,
+остальные — построчными изменениями относительно предыдущей версии.
+Изменения записываются списком JSON: положительное число — взять
+столько строк из предыдущей версии, отрицательное — пропустить
+столько строк, строка — вставить её. Размер такой записи
+пропорционален объёму правки, а для восстановления любой версии
+нужно не больше K - 1 изменений поверх ближайшей полной копии
+(больше — только в цепочках, записанных до уменьшения K).
+"""
+import json
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Subquery
+from django.utils import timezone
+
+from .compression import CompressedText
+from .models import Note, NoteRevision
+
+
+def make_delta(old, new):
+    """Построчные изменения, превращающие old в new."""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    matcher = SequenceMatcher(None, old_lines, new_lines)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append(old_end - old_start)
+            continue
+        if old_end > old_start:
+            delta.append(old_start - old_end)
+        delta.extend(new_lines[new_start:new_end])
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    lines = []
+    position = 0
+    for operation in delta:
+        if isinstance(operation, str):
+            lines.append(operation)
+        elif operation > 0:
+            lines.extend(old_lines[position:position + operation])
+            position += operation
+        else:
+            position -= operation
+    return ''.join(lines)
+
+
+def get_chain(note_id, number=None):
+    """
+    Версии от ближайшей полной копии до number включительно
+    (по умолчанию до последней) в порядке возрастания; один запрос.
+
+    Длина цепочки не ограничивается K: если настройку уменьшили,
+    старые цепочки длиннее новой K.
+    """
+    revisions = NoteRevision.objects.filter(note_id=note_id)
+    if number is not None:
+        revisions = revisions.filter(number__lte=number)
+    last_snapshot = revisions.filter(is_snapshot=True).order_by(
+        '-number'
+    ).values('number')[:1]
+    return list(revisions.filter(
+        number__gte=Subquery(last_snapshot)
+    ).order_by('number'))
+
+
+def reconstruct(chain):
+    """Текст последней версии цепочки."""
+    if not chain[0].is_snapshot:
+        raise ValueError(
+            f'Цепочка версий заметки {chain[0].note_id} начинается '
+            f'не с полной копии: {chain[0].number}'
+        )
+    text = chain[0].data
+    for revision in chain[1:]:
+        text = apply_delta(text, json.loads(revision.data))
+    return text
+
+
+def get_changed_text(note):
+    """
+    Текст заметки, если его меняли после загрузки, иначе None.
+
+    Нераспакованный или отложенный текст не трогали — он совпадает
+    с последней версией, и распаковывать его не нужно.
+    """
+    text = note.__dict__.get('text')
+    if text is None or isinstance(text, CompressedText):
+        return None
+    return text
+
+
+def record_revision(note, created=False):
+    """Сохраняет новую версию заметки, если текст или заголовок изменились."""
+    chain = [] if created else get_chain(note.pk)
+    if not chain:
+        return NoteRevision.objects.create(
+            note=note, number=1, title=note.title, is_snapshot=True,
+            data=note.text,
+        )
+    previous = chain[-1]
+    previous_text = reconstruct(chain)
+    text = get_changed_text(note)
+    if text is None:
+        text = previous_text
+    if text == previous_text and note.title == previous.title:
+        return None
+    delta = json.dumps(
+        make_delta(previous_text, text),
+        ensure_ascii=False, separators=(',', ':'),
+    )
+    is_snapshot = (
+        len(chain) >= settings.NOTES_REVISION_SNAPSHOT_EVERY
+        or len(delta) >= len(text)
+    )
+    return NoteRevision.objects.create(
+        note=note, number=previous.number + 1, title=note.title,
+        is_snapshot=is_snapshot, data=text if is_snapshot else delta,
+    )
+
+
+def snapshot_notes(notes):
+    """
+    Первые версии для заметок без истории одним INSERT ... SELECT:
+    текст копируется в базе в уже сжатом виде.
+    """
+    notes = notes.filter(revisions__isnull=True).values('id', 'title', 'text')
+    select_sql, params = notes.query.sql_with_params()
+    table = connection.ops.quote_name(NoteRevision._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} '
+            '(note_id, number, created, title, is_snapshot, data) '
+            f'SELECT id, 1, %s, title, %s, text FROM ({select_sql}) notes',
+            (timezone.now(), True, *params),
+        )
+        return cursor.rowcount
+
+
+def prune_revisions(note_id, keep):
+    """Оставляет keep последних версий; самая старая становится копией."""
+    numbers = NoteRevision.objects.filter(note_id=note_id).order_by(
+        '-number'
+    ).values_list('number', flat=True)[keep - 1:keep]
+    if not numbers:
+        return 0
+    chain = get_chain(note_id, numbers[0])
+    oldest = chain[-1]
+    if not oldest.is_snapshot:
+        oldest.data = reconstruct(chain)
+        oldest.is_snapshot = True
+        oldest.save(update_fields=('data', 'is_snapshot'))
+    deleted, _ = NoteRevision.objects.filter(
+        note_id=note_id, number__lt=oldest.number
+    ).delete()
+    return deleted
+
+
+def get_notes_to_prune(keep):
+    return Note.objects.annotate(
+        revisions_count=Count('revisions')
+    ).filter(revisions_count__gt=keep).values_list('id', flat=True)
@@ -0,0 +1,158 @@
+"""
+Полнотекстовый поиск по заметкам пользователя.
+
+В SQLite запросы идут в виртуальную таблицу FTS5 ``notes_note_fts``:
+ранжирование по bm25, подсветка фрагментов и поиск по началу слова.
+На других СУБД используется простой поиск по вхождению.
+
+Текст заметок сжат, поэтому индекс хранит распакованную копию
+и заполняется из Python: сигналы notes.signals, импорт и загрузка
+синтетических данных. В схеме нет триггеров и функций Python, и писать
+в ``notes_note`` можно любым клиентом SQLite; такие правки попадают
+в индекс после команды reindex_notes.
+"""
+import re
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from django.utils.text import Truncator
+
+from .models import Note
+
+FTS_TABLE = 'notes_note_fts'
+TERM_PATTERN = re.compile(r'\w+')
+# Служебные символы не встречаются в тексте заметок и переживают
+# экранирование HTML, поэтому подсветка безопасна.
+MARK_START = '\x02'
+MARK_END = '\x03'
+SNIPPET_WORDS = 16
+INDEX_SQL = (
+    f'INSERT OR REPLACE INTO {FTS_TABLE} (rowid, title, text) '
+    'VALUES (%s, %s, %s)'
+)
+UNINDEX_SQL = f'DELETE FROM {FTS_TABLE} WHERE rowid = %s'
+
+SEARCH_SQL = f"""
+    SELECT note.id, note.slug, note.title,
+        snippet({FTS_TABLE}, 1, '{MARK_START}', '{MARK_END}', '…', %s)
+    FROM {FTS_TABLE}
+    JOIN notes_note AS note ON note.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH %s AND note.author_id = %s
+    ORDER BY bm25({FTS_TABLE})
+    LIMIT %s
+"""
+
+
+@dataclass
+class SearchResult:
+    id: int
+    slug: str
+    title: str
+    snippet: str
+
+
+def index_note(note):
+    """Добавляет заметку в индекс или заменяет её там."""
+    if connection.vendor != 'sqlite':
+        return
+    # Распаковывается копия: текст, оставшийся в заметке нераспакованным,
+    # при следующем сохранении не сжимается заново.
+    text = note.__dict__['text'] if 'text' in note.__dict__ else note.text
+    with connection.cursor() as cursor:
+        cursor.execute(INDEX_SQL, (note.pk, note.title, str(text)))
+
+
+def unindex_note(note_id):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(UNINDEX_SQL, (note_id,))
+
+
+def index_notes(queryset):
+    """Индексирует заметки из queryset пачками, например после
+    bulk_create, который не отправляет сигналы.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    rows = queryset.order_by().values_list('pk', 'title', 'text').iterator(
+        chunk_size=settings.NOTES_TRANSFER_BATCH_SIZE
+    )
+    batch = []
+    with connection.cursor() as cursor:
+        for note_id, title, text in rows:
+            batch.append((note_id, title, str(text)))
+            if len(batch) == settings.NOTES_TRANSFER_BATCH_SIZE:
+                cursor.executemany(INDEX_SQL, batch)
+                batch = []
+        cursor.executemany(INDEX_SQL, batch)
+
+
+def rebuild_index(queryset):
+    """Строит индекс заново, например после правок в обход Django."""
+    if connection.vendor != 'sqlite':
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        index_notes(queryset)
+
+
+def get_terms(query):
+    return TERM_PATTERN.findall(query)
+
+
+def make_match_query(terms):
+    """Каждое слово ищется по началу; все слова обязательны."""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(MARK_START, '<mark>').replace(
+            MARK_END, '</mark>'
+        )
+    )
+
+
+def search_fts(author, terms, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SEARCH_SQL,
+            (SNIPPET_WORDS, make_match_query(terms), author.pk, limit)
+        )
+        return [
+            SearchResult(note_id, slug, title, highlight(snippet))
+            for note_id, slug, title, snippet in cursor.fetchall()
+        ]
+
+
+def search_fallback(author, terms, limit):
+    """Текст хранится сжатым, поэтому вхождение ищется не в SQL,
+    а в распакованных заметках автора, от новых к старым.
+    """
+    terms = [term.casefold() for term in terms]
+    results = []
+    for note in Note.objects.filter(author=author).order_by('-id').iterator():
+        content = f'{note.title}\n{note.text}'.casefold()
+        if all(term in content for term in terms):
+            results.append(SearchResult(
+                note.id, note.slug, note.title,
+                Truncator(note.text).words(SNIPPET_WORDS)
+            ))
+            if len(results) == limit:
+                break
+    return results
+
+
+def search_notes(author, query, limit):
+    """Заметки автора, подходящие под запрос, лучшие первыми."""
+    terms = get_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == 'sqlite':
+        return search_fts(author, terms, limit)
+    return search_fallback(author, terms, limit)
@@ -0,0 +1,248 @@
+"""
+Синтетические данные большого объёма: пользователи и заметки.
+
+Содержимое зависит только от seed: тексты собираются из словаря,
+который строит random.Random(seed). Строки вставляются пачками через
+bulk_create или, с raw=True, через executemany по сырому INSERT, без
+объектов моделей. Индекс FTS5 и первые версии истории заполняются
+после вставки, каждый одним INSERT ... SELECT.
+
+Транзакцией управляет вызывающий код: вся загрузка должна идти
+в одной транзакции, иначе SQLite фиксирует каждую пачку на диск.
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache, partial
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .compression import CompressedText, encode
+from .models import Note
+from .revisions import snapshot_notes
+from .search import FTS_TABLE
+
+User = get_user_model()
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+PASSWORD = 'seed-password'
+ALPHABET = 'абвгдежзиклмнопрстуфхцчшэюя'
+# Значения этих полей уходят в executemany как есть.
+PASSTHROUGH = {
+    'AutoField', 'BigAutoField', 'BooleanField', 'CharField', 'ForeignKey',
+    'IntegerField', 'PositiveIntegerField', 'SlugField', 'TextField',
+}
+# Заметки берут текст из готового набора уже сжатых текстов: собирать
+# и сжимать текст на каждую из миллионов строк дольше, чем вставлять её.
+# Для маленькой загрузки набор не больше числа строк.
+TEXT_POOL_SIZE = 10_000
+
+
+def batched(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+@lru_cache(maxsize=1)
+def adapt_datetime(value):
+    """
+    То же, что adapt_datetimefield_value в SQLite при USE_TZ, без
+    проверок часового пояса на каждое значение. Кеш на одно значение:
+    created и updated в строке обычно совпадают.
+    """
+    return str(value.astimezone(timezone.utc).replace(tzinfo=None))
+
+
+def get_preparer(field, connection):
+    """
+    Функция, которая готовит значение поля для executemany, или None,
+    если значение подходит как есть.
+    """
+    internal_type = field.get_internal_type()
+    if internal_type in PASSTHROUGH:
+        return None
+    if connection.vendor == 'sqlite' and settings.USE_TZ:
+        if internal_type == 'DateTimeField':
+            return adapt_datetime
+        if internal_type == 'DateField':
+            return str
+    return partial(field.get_db_prep_save, connection=connection)
+
+
+@contextmanager
+def indexes_deferred(connection, table):
+    """
+    В SQLite снимает вторичные индексы таблицы на время загрузки и строит
+    их заново в конце: один проход по готовым данным дешевле, чем
+    обновлять индексы на каждой строке. Внутри транзакции изменение
+    схемы откатывается вместе с данными.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+            'AND tbl_name = %s AND sql IS NOT NULL', (table,)
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    yield
+    with connection.cursor() as cursor:
+        for _, sql in indexes:
+            cursor.execute(sql)
+
+
+def index_new_notes(connection, last_id):
+    """
+    Индексирует заметки с id больше last_id одним INSERT ... SELECT
+    через функцию notes_text соединения Django. FTS5 сбрасывает
+    накопленные термы на диск после каждой инструкции, поэтому
+    построчная индексация обходится в разы дороже.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+            'SELECT id, title, notes_text(text) FROM notes_note '
+            'WHERE id > %s', (last_id,)
+        )
+
+
+def insert_rows(model, field_names, rows, batch_size, raw=False):
+    """
+    Вставляет строки — кортежи значений полей field_names в том же
+    порядке. Возвращает число вставленных строк.
+    """
+    fields = [model._meta.get_field(name) for name in field_names]
+    # Само соединение, а не прокси django.db.connection: обращение
+    # к прокси на каждое значение заметно в профиле.
+    connection = connections[DEFAULT_DB_ALIAS]
+    count = 0
+    if not raw:
+        names = [field.attname for field in fields]
+        for batch in batched(rows, batch_size):
+            model.objects.bulk_create(
+                model(**dict(zip(names, row))) for row in batch
+            )
+            count += len(batch)
+        return count
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    preparers = [get_preparer(field, connection) for field in fields]
+    with indexes_deferred(connection, model._meta.db_table), \
+            connection.cursor() as cursor:
+        for batch in batched(rows, batch_size):
+            cursor.executemany(sql, [
+                [
+                    value if prepare is None else prepare(value)
+                    for prepare, value in zip(preparers, row)
+                ]
+                for row in batch
+            ])
+            count += len(batch)
+    return count
+
+
+def make_vocabulary(rng, size=5000):
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+        for _ in range(size)
+    ]
+
+
+class Seeder:
+    """
+    Генератор данных одного прогона. prefix делает уникальными имена
+    пользователей и slug, поэтому повторный запуск с тем же seed на той
+    же базе упрётся в ограничение уникальности.
+    """
+
+    def __init__(self, seed=0, batch_size=10_000, raw=False):
+        self.rng = random.Random(seed)
+        self.words = make_vocabulary(self.rng)
+        self.prefix = f'seed{seed}'
+        self.batch_size = batch_size
+        self.raw = raw
+        self.rows = 0
+
+    def insert(self, model, field_names, rows):
+        self.rows += insert_rows(
+            model, field_names, rows, self.batch_size, self.raw
+        )
+
+    def new_ids(self, model, last_id):
+        return list(
+            model.objects.filter(pk__gt=last_id).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def last_id(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    def sentence(self, low, high):
+        return ' '.join(self.rng.choices(self.words, k=self.rng.randint(
+            low, high
+        )))
+
+    def seed_users(self, count):
+        """Пользователи с общим паролем PASSWORD; возвращает их id."""
+        last_id = self.last_id(User)
+        password = make_password(PASSWORD)
+        self.insert(User, (
+            'username', 'password', 'first_name', 'last_name', 'email',
+            'is_staff', 'is_active', 'is_superuser', 'date_joined',
+        ), (
+            (
+                f'{self.prefix}-{index}', password, '', '', '',
+                False, True, False, EPOCH,
+            )
+            for index in range(count)
+        ))
+        return self.new_ids(User, last_id)
+
+    def seed_notes(self, user_ids, per_user):
+        """
+        per_user заметок каждому пользователю, у каждой — первая
+        версия в истории.
+        """
+        last_id = self.last_id(Note)
+        rng = self.rng
+        size = min(TEXT_POOL_SIZE, len(user_ids) * per_user)
+        titles = [self.sentence(1, 4)[:100] for _ in range(size)]
+        # Каждая пятая заметка длинная и хранится сжатой.
+        texts = [
+            CompressedText(encode(
+                self.sentence(100, 300) if index % 5 == 0
+                else self.sentence(5, 40)
+            ))
+            for index in range(size)
+        ]
+
+        def rows():
+            for number, user_id in enumerate(user_ids):
+                for index in range(per_user):
+                    yield (
+                        rng.choice(titles), rng.choice(texts),
+                        f'{self.prefix}-{number}-{index}', user_id,
+                    )
+
+        self.insert(Note, ('title', 'text', 'slug', 'author'), rows())
+        index_new_notes(connections[DEFAULT_DB_ALIAS], last_id)
+        self.rows += snapshot_notes(Note.objects.filter(pk__gt=last_id))
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate
+from .compression import decode
+from .models import Note
+from .revisions import record_revision
+from .search import index_note, unindex_note
+
+from yacommon.auth import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_author_cache(sender, instance, raw=False, **kwargs):
+    """Любое изменение заметки сбрасывает кеш её автора."""
+    if raw:
+        return
+    invalidate(instance.author_id)
+
+
+def decode_or_null(value):
+    return None if value is None else decode(value)
+
+
+@receiver(post_save, sender=Note)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_note(instance)
+
+
+@receiver(post_delete, sender=Note)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_note(instance.pk)
+
+
+@receiver(connection_created)
+def register_sql_functions(sender, connection, **kwargs):
+    """
+    notes_text(text) в SQLite — для индексации пачкой одним
+    INSERT ... SELECT. Схема от функции не зависит: она есть только
+    в соединениях Django.
+    """
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            'notes_text', 1, decode_or_null, deterministic=True
+        )
+
+
+@receiver(post_save, sender=Note)
+def save_revision(sender, instance, created, raw=False, **kwargs):
+    """Каждое сохранение с изменённым текстом попадает в историю."""
+    if raw:
+        return
+    record_revision(instance, created)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Изменённый пользователь, в том числе со сменой пароля, читается
+    из базы заново.
+    """
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -0,0 +1,118 @@
+"""
+Подбор уникальных slug для заметок.
+
+Для основы ``base`` выдаются ``base``, ``base-2``, ``base-3``… Все
+занятые варианты всех основ читаются одним запросом по диапазону
+префиксов, который обслуживается уникальным индексом по slug. Гонку
+между проверкой и вставкой закрывает повтор сохранения в точке
+сохранения при IntegrityError.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from pytils.translit import slugify
+
+# Место под суффикс вида «-1234567».
+SUFFIX_RESERVE = 8
+DEFAULT_BASE = 'note'
+ATTEMPTS = 3
+# slug состоит только из ASCII, «~» больше любого допустимого символа.
+PREFIX_UPPER_BOUND = '~'
+PREFIXES_PER_QUERY = 100
+
+
+def make_base(model, title):
+    """Основа slug из заголовка, обрезанная до длины поля."""
+    max_length = model._meta.get_field('slug').max_length
+    return slugify(title)[:max_length] or DEFAULT_BASE
+
+
+def get_taken_slugs(model, prefixes, exclude_pk=None):
+    """
+    Занятые slug, начинающиеся с любого из префиксов.
+
+    Для одной основы это один запрос по диапазону. Для больших пачек
+    условия объединяются порциями по PREFIXES_PER_QUERY, потому что
+    построение огромного OR в ORM растёт квадратично.
+    """
+    prefixes = sorted(prefixes)
+    queryset = model._default_manager.all()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    taken = set()
+    for start in range(0, len(prefixes), PREFIXES_PER_QUERY):
+        ranges = [
+            Q(slug__gte=prefix, slug__lt=prefix + PREFIX_UPPER_BOUND)
+            for prefix in prefixes[start:start + PREFIXES_PER_QUERY]
+        ]
+        taken.update(queryset.filter(
+            Q(*ranges, _connector=Q.OR)
+        ).values_list('slug', flat=True))
+    return taken
+
+
+def allocate_slugs(model, bases, exclude_pk=None):
+    """Свободные slug для списка основ; основы могут повторяться."""
+    if not bases:
+        return []
+    max_length = model._meta.get_field('slug').max_length
+    taken = get_taken_slugs(
+        model,
+        {base[:max_length - SUFFIX_RESERVE] for base in bases},
+        exclude_pk,
+    )
+    # Номер, с которого продолжать перебор для основы: одинаковые
+    # основы в пачке не перебирают суффиксы заново с начала.
+    last_numbers = {}
+    slugs = []
+    for base in bases:
+        slug, number = base, last_numbers.get(base, 1)
+        while slug in taken:
+            number += 1
+            suffix = f'-{number}'
+            slug = base[:max_length - len(suffix)] + suffix
+        last_numbers[base] = number
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def save_with_slug(obj, save):
+    """
+    Подбирает slug объекту без slug и сохраняет его вызовом save.
+
+    Если slug успели занять между подбором и вставкой, подбор
+    повторяется до ATTEMPTS раз.
+    """
+    model = type(obj)
+    for attempt in range(ATTEMPTS):
+        obj.slug = allocate_slugs(
+            model, [make_base(model, obj.title)], exclude_pk=obj.pk
+        )[0]
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            obj.slug = ''
+            if attempt == ATTEMPTS - 1:
+                raise
+
+
+def bulk_create_with_slugs(model, objs, batch_size=None):
+    """
+    bulk_create, при котором slug подбираются сразу для всех объектов.
+
+    Указанный у объекта slug служит основой: если он занят, объект
+    получит его вариант с суффиксом, а не ошибку.
+    """
+    bases = [obj.slug or make_base(model, obj.title) for obj in objs]
+    for attempt in range(ATTEMPTS):
+        for obj, slug in zip(objs, allocate_slugs(model, bases)):
+            obj.slug = slug
+        try:
+            with transaction.atomic():
+                return model._default_manager.bulk_create(
+                    objs, batch_size=batch_size
+                )
+        except IntegrityError:
+            if attempt == ATTEMPTS - 1:
+                raise
@@ -0,0 +1,11 @@
+from django import template
+
+from notes.markup import render_markdown
+
+register = template.Library()
+
+
+@register.filter(name='markdown')
+def markdown_filter(text):
+    """Текст заметки в Markdown, отрисованный в HTML."""
+    return render_markdown(text)
@@ -0,0 +1,3 @@
+from yacommon.testing import (  # noqa: F401
+    clear_caches, django_db_modify_db_settings, strict_query_budget,
+)
@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from yacommon.auth import USER_KEY, get_cache
+
+User = get_user_model()
+
+LIST_URL = reverse('notes:list')
+
+
+class TestCachedUser(TestCase):
+    """Сессия и пользователь на тёплом кеше не читаются из базы."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_warm_cache_skips_session_and_user_queries(self):
+        requests = []
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.author_client.get(LIST_URL)
+            self.assertTrue(response.wsgi_request.user.is_authenticated)
+            requests.append([query['sql'] for query in queries])
+        cold, warm = (
+            [sql for sql in queries if 'auth_user' in sql or 'session' in sql]
+            for queries in requests
+        )
+        self.assertEqual(len(cold), 1)
+        self.assertEqual(warm, [])
+
+    def test_invalidation(self):
+        """Сохранение пользователя и выход сбрасывают запись в кеше,
+        после смены пароля сессия перестаёт действовать.
+        """
+        key = USER_KEY.format(user_id=self.author.pk)
+        self.author_client.get(LIST_URL)
+        self.author.first_name = 'Новое имя'
+        self.author.save()
+        response = self.author_client.get(LIST_URL)
+        self.assertEqual(response.wsgi_request.user.first_name, 'Новое имя')
+        self.author_client.get(reverse('users:logout'))
+        self.assertIsNone(get_cache().get(key))
+        self.author_client.force_login(self.author)
+        self.author_client.get(LIST_URL)
+        self.assertIsNotNone(get_cache().get(key))
+        self.author.set_password('новый пароль')
+        self.author.save()
+        response = self.author_client.get(LIST_URL)
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
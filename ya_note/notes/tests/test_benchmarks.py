@@ -0,0 +1,18 @@
+from django.test import SimpleTestCase
+
+from yacommon.benchmarks import find_regressions
+
+
+class TestBenchmarks(SimpleTestCase):
+
+    def test_benchmark_regressions(self):
+        """Лишний SQL-запрос — всегда регрессия, время — сверх допуска."""
+        baseline = {'wsgi': {'login': {'p50': 10, 'p95': 20, 'queries': 5}}}
+        results = {'wsgi': {'login': {'p50': 14, 'p95': 50, 'queries': 6}}}
+        self.assertEqual(
+            len(find_regressions(results, baseline, {'p50': 0.5})), 1
+        )
+        self.assertEqual(
+            len(find_regressions(results, baseline, {'p50': 0.25, 'p95': 1})),
+            3
+        )
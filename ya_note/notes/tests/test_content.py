@@ -1,7 +1,12 @@
-from django.test import Client, TestCase
+import base64
+import json
+from http import HTTPStatus
+
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from notes.markup import RENDER_CACHE, RenderCache
 from notes.models import Note
 from notes.forms import NoteForm
 
@@ -10,8 +15,10 @@ User = get_user_model()
 SLUG = 'slug'
 
 NOTES_LIST_URL = reverse('notes:list')
+SEARCH_URL = reverse('notes:search')
 NOTES_ADD_URL = reverse('notes:add')
 NOTES_EDIT_URL = reverse('notes:edit', args=(SLUG,))
+NOTES_DETAIL_URL = reverse('notes:detail', args=(SLUG,))
 
 
 class TestNotesPages(TestCase):
@@ -49,6 +56,95 @@ class TestNotesPages(TestCase):
         object_list = response.context['object_list']
         self.assertEqual(len(object_list), 0)
 
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_notes_list_paginated_without_text(self):
+        """Список заметок выводится постранично по курсору,
+        а тексты заметок не загружаются.
+        """
+        for index in range(4):
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=self.author
+            )
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client_author.get(
+                NOTES_LIST_URL, {'cursor': cursor} if cursor else {}
+            )
+            page = response.context['page_obj']
+            for note in page:
+                self.assertIn('text', note.get_deferred_fields())
+            seen += [note.id for note in page]
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(
+            seen,
+            list(Note.objects.filter(
+                author=self.author
+            ).order_by('id').values_list('id', flat=True))
+        )
+
+    def test_invalid_cursor(self):
+        """Испорченный или подделанный курсор приводит к ошибке 400."""
+        for items in (['n', None], ['n', ['1']], ['n', str(10 ** 30)]):
+            cursor = base64.urlsafe_b64encode(json.dumps(items).encode())
+            with self.subTest(items=items):
+                response = self.client_author.get(
+                    NOTES_LIST_URL, {'cursor': cursor.decode()}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_search_own_notes(self):
+        """Поиск находит заметки по началу слова, подсвечивает совпадения
+        и не показывает чужие заметки.
+        """
+        note = Note.objects.create(
+            title='Покупки', text='Купить <b>молоко</b> и хлеб',
+            author=self.author
+        )
+        Note.objects.create(
+            title='Чужое', text='Молоко', author=self.another_author
+        )
+        response = self.client_author.get(SEARCH_URL, {'q': 'МОЛ'})
+        results = response.context['results']
+        self.assertEqual([result.id for result in results], [note.id])
+        self.assertIn('<mark>молоко</mark>', results[0].snippet)
+        self.assertNotIn('<b>', results[0].snippet)
+
+    def test_detail_renders_markdown_safely(self):
+        """Текст заметки отрисовывается из Markdown, сырой HTML и опасные
+        ссылки не попадают в страницу, HTML берётся из кеша по хешу текста.
+        """
+        Note.objects.filter(pk=self.note.pk).update(text=(
+            '# Список\n\n* **раз**\n* [два](https://example.com)\n\n'
+            '<script>alert(1)</script> [три](javascript:alert(1))'
+        ))
+        RENDER_CACHE.clear()
+        content = self.client_author.get(NOTES_DETAIL_URL).content.decode()
+        self.assertIn('<h1>Список</h1>', content)
+        self.assertIn('<strong>раз</strong>', content)
+        self.assertIn('<a href="https://example.com">два</a>', content)
+        self.assertIn('&lt;script&gt;', content)
+        self.assertNotIn('<script>alert', content)
+        self.assertNotIn('javascript:', content)
+        self.assertEqual(len(RENDER_CACHE), 1)
+        self.client_author.get(NOTES_DETAIL_URL)
+        self.assertEqual(len(RENDER_CACHE), 1)
+
+    def test_render_cache_evicts_least_recently_used(self):
+        cache = RenderCache(max_size=10)
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        cache.get('a')
+        cache.set('c', 'cccc')
+        self.assertEqual((cache.get('a'), cache.get('b')), ('aaaa', None))
+        self.assertEqual(cache.size, 8)
+        cache.set('big', 'x' * 11)
+        self.assertIsNone(cache.get('big'))
+
     def test_anonymous_client_has_no_form(self):
         """На страницы создания и редактирования заметки
         для анонимного пользователя не передаются формы.
@@ -0,0 +1,51 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.views import NotesList
+from yacommon.instrumentation import QueryBudgetExceeded
+
+User = get_user_model()
+
+LIST_URL = reverse('notes:list')
+
+
+class TestRequestTiming(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+
+    def test_server_timing_header(self):
+        timing = self.author_client.get(LIST_URL)['Server-Timing']
+        for metric in ('db;dur=', 'queries"', 'tpl;dur=', 'view;dur='):
+            self.assertIn(metric, timing)
+
+    def test_server_timing_templates(self):
+        """Время отрисовки разбито по шаблонам, включая {% include %}."""
+        timing = self.author_client.get(LIST_URL)['Server-Timing']
+        self.assertIn('tpl-part;dur=', timing)
+        for name in ('notes/list.html', 'includes/header.html'):
+            self.assertIn(f'desc="{name}"', timing)
+
+    def test_query_budget(self):
+        """В тестах превышение бюджета — ошибка, в работе — предупреждение."""
+        with mock.patch.object(NotesList, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.author_client.get(LIST_URL)
+            # На тёплом кеше список не делает запросов вовсе.
+            for cache in caches.all():
+                cache.clear()
+            with override_settings(QUERY_BUDGET_STRICT=False):
+                with self.assertLogs(
+                    'yacommon.instrumentation', 'WARNING'
+                ) as logs:
+                    response = self.author_client.get(LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('notes.views.NotesList', logs.output[0])
@@ -1,21 +1,38 @@
+import json
 from http import HTTPStatus
+from io import StringIO
+from tempfile import NamedTemporaryFile, TemporaryDirectory
+
 from pytils.translit import slugify
 
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
-from notes.models import Note
+from notes.caching import STATS
+from notes.compression import RAW, ZLIB, CompressedText
+from notes.models import Note, NoteRevision
+from notes.revisions import get_chain, reconstruct
+from notes.slugs import allocate_slugs, bulk_create_with_slugs, make_base
 from notes.forms import WARNING
+from notes.search import search_notes
 
 User = get_user_model()
 
 SLUG = 'slug'
 
 ADD_NOTE_URL = reverse('notes:add')
+DETAIL_NOTE_URL = reverse('notes:detail', args=(SLUG,))
 EDIT_NOTE_URL = reverse('notes:edit', args=(SLUG,))
 DELETE_NOTE_URL = reverse('notes:delete', args=(SLUG,))
 SUCCESS_URL = reverse('notes:success')
+LIST_URL = reverse('notes:list')
+HISTORY_URL = reverse('notes:history', args=(SLUG,))
+IMPORT_URL = reverse('notes:import')
+EXPORT_URL = reverse('notes:export')
 
 
 class TestNoteCreation(TestCase):
@@ -72,6 +89,108 @@ class TestNoteCreation(TestCase):
         self.assertEqual(note.text, self.form_data['text'])
         self.assertEqual(note.author, self.user)
 
+    def test_empty_slug_gets_free_suffix(self):
+        """Если slug из заголовка занят, подбирается свободный суффикс."""
+        Note.objects.all().delete()
+        self.form_data.pop('slug')
+        for expected_slug in ('title', 'title-2', 'title-3'):
+            with self.subTest(expected_slug=expected_slug):
+                self.auth_client.post(ADD_NOTE_URL, data=self.form_data)
+                self.assertTrue(
+                    Note.objects.filter(slug=expected_slug).exists()
+                )
+
+    def test_bulk_create_with_slugs(self):
+        """Slug для пачки заметок подбираются одним запросом."""
+        Note.objects.create(
+            title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.user
+        )
+        notes = [
+            Note(title=self.NOTE_TITLE, text=self.NOTE_TEXT, author=self.user)
+            for _ in range(3)
+        ]
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(
+                Note, [make_base(Note, note.title) for note in notes]
+            )
+        self.assertEqual(slugs, ['title-2', 'title-3', 'title-4'])
+        bulk_create_with_slugs(Note, notes)
+        self.assertEqual(Note.objects.count(), 4)
+
+
+class TestNoteImportExport(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='title', text='Текст', slug=SLUG, author=cls.author
+        )
+
+    def test_import_notes(self):
+        """Импорт создаёт заметки пачками, занятый slug получает суффикс,
+        а ошибочные строки пропускаются.
+        """
+        lines = (
+            '{"title": "Первая", "text": "Текст", "slug": "slug"}\n'
+            '{"title": "Вторая", "text": "Текст"}\n'
+            'не json\n'
+            '{"title": "Без текста"}\n'
+        )
+        upload = SimpleUploadedFile('notes.jsonl', lines.encode())
+        response = self.author_client.post(IMPORT_URL, {'file': upload})
+        result = response.context['result']
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(
+            set(Note.objects.values_list('slug', flat=True)),
+            {SLUG, 'slug-2', slugify('Вторая')}
+        )
+        self.assertEqual(
+            NoteRevision.objects.filter(number=1).count(), 3
+        )
+
+    def test_import_rejects_non_string_fields(self):
+        """Поля, которые не являются строками, — ошибка строки,
+        а не ответ 500 и не строка "['x']" в заметке.
+        """
+        lines = (
+            '{"title": "a", "text": "b", "slug": 123}\n'
+            '{"title": ["x"], "text": 5}\n'
+            '{"title": "Нормальная", "text": "Текст"}\n'
+        )
+        upload = SimpleUploadedFile('notes.jsonl', lines.encode())
+        response = self.author_client.post(IMPORT_URL, {'file': upload})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        result = response.context['result']
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual(
+            set(Note.objects.values_list('title', flat=True)),
+            {'title', 'Нормальная'}
+        )
+
+    def test_export_import_round_trip(self):
+        """Выгрузка и загрузка через команды сохраняют заметки."""
+        response = self.author_client.get(EXPORT_URL)
+        exported = b''.join(response.streaming_content).decode()
+        self.assertEqual(
+            [json.loads(line)['slug'] for line in exported.splitlines()],
+            [SLUG]
+        )
+        output = StringIO()
+        call_command('export_notes', user=self.author.username,
+                     stdout=output, stderr=StringIO())
+        self.assertEqual(output.getvalue(), exported)
+        with NamedTemporaryFile('w', suffix='.jsonl') as jsonl_file:
+            jsonl_file.write(exported)
+            jsonl_file.flush()
+            call_command('import_notes', jsonl_file.name,
+                         user=self.author.username, stdout=StringIO())
+        self.assertEqual(Note.objects.count(), 2)
+
 
 class TestCommentEditDelete(TestCase):
     NOTE_TITLE = 'title'
@@ -154,3 +273,296 @@ class TestCommentEditDelete(TestCase):
         self.assertEqual(note.text, self.note.text)
         self.assertEqual(note.slug, self.note.slug)
         self.assertEqual(note.author, self.note.author)
+
+
+class TestNoteQueryCount(TestCase):
+    """Число запросов к базе в сценариях работы с заметками
+    зафиксировано, чтобы повторные выборки объекта не вернулись.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='title', text='Текст', slug=SLUG, author=cls.author
+        )
+        cls.form_data = {'title': 'New title', 'text': 'New text'}
+
+    def test_query_count(self):
+        # Первый запрос читает сессию и пользователя из базы, следующие
+        # берут их из кеша.
+        flows = (
+            ('post', ADD_NOTE_URL, {'slug': 'new', **self.form_data}, 8),
+            ('get', DETAIL_NOTE_URL, None, 1),
+            ('get', EDIT_NOTE_URL, None, 1),
+            ('post', EDIT_NOTE_URL, {'slug': SLUG, **self.form_data}, 8),
+            ('get', DELETE_NOTE_URL, None, 1),
+            ('post', DELETE_NOTE_URL, None, 4),
+        )
+        for method, url, data, expected_queries in flows:
+            with self.subTest(method=method, url=url):
+                with self.assertNumQueries(expected_queries):
+                    getattr(self.author_client, method)(url, data=data)
+
+
+class TestNoteCache(TestCase):
+    """Списки и заметки отдаются из кеша автора до первого изменения."""
+    FILE_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Читатель')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.note = Note.objects.create(
+            title='title', text='Текст', slug=SLUG, author=cls.author
+        )
+
+    def check_cache(self):
+        STATS.reset()
+        self.reader_client.get(LIST_URL)
+        for url in (LIST_URL, DETAIL_NOTE_URL):
+            self.author_client.get(url)
+            # На тёплом кеше, включая сессию и пользователя, запросов
+            # к базе нет.
+            with self.assertNumQueries(0):
+                self.author_client.get(url)
+        self.author_client.post(
+            EDIT_NOTE_URL, {'title': 'Новый', 'text': 'Текст', 'slug': SLUG}
+        )
+        response = self.author_client.get(DETAIL_NOTE_URL)
+        self.assertEqual(response.context['note'].title, 'Новый')
+        response = self.author_client.get(LIST_URL)
+        self.assertEqual(response.context['object_list'][0].title, 'Новый')
+        # Правка автора не трогает кеш другого пользователя.
+        with self.assertNumQueries(0):
+            self.reader_client.get(LIST_URL)
+        self.assertEqual(STATS.as_dict()['hits'], 3)
+        self.assertEqual(STATS.as_dict()['misses'], 5)
+
+    def test_locmem_cache(self):
+        self.check_cache()
+
+    def test_file_cache(self):
+        with TemporaryDirectory() as location:
+            caches = {'default': {
+                'BACKEND': self.FILE_CACHE, 'LOCATION': location
+            }}
+            with override_settings(CACHES=caches):
+                self.check_cache()
+
+
+class TestSeedScale(TestCase):
+
+    def test_seed_scale_command(self):
+        """Одинаковый seed даёт одинаковые заметки в обоих режимах
+        вставки; заметки находятся поиском и имеют первую версию.
+        """
+        snapshots = []
+        for raw in (True, False):
+            call_command(
+                'seed_scale', users=2, notes_per_user=30, raw=raw,
+                stdout=StringIO()
+            )
+            notes = Note.objects.order_by('pk')
+            self.assertEqual(notes.count(), 60)
+            self.assertEqual(NoteRevision.objects.count(), 60)
+            note = notes.first()
+            self.assertIn(note.pk, [
+                result.id for result in search_notes(
+                    note.author, note.title.split()[0], 60
+                )
+            ])
+            snapshots.append([
+                (note.title, note.text, note.slug, note.author.username)
+                for note in notes.select_related('author')
+            ])
+            Note.objects.all().delete()
+            User.objects.all().delete()
+        self.assertEqual(snapshots[0], snapshots[1])
+
+
+class TestNoteCompression(TestCase):
+    LONG_TEXT = 'ERROR: соединение потеряно\n' * 500
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.long_note = Note.objects.create(
+            title='Лог', text=cls.LONG_TEXT, author=cls.author
+        )
+        cls.short_note = Note.objects.create(
+            title='Коротко', text='Текст', author=cls.author
+        )
+
+    def get_stored(self, note):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT text FROM notes_note WHERE id = %s', (note.id,)
+            )
+            return bytes(cursor.fetchone()[0])
+
+    def test_long_text_is_stored_compressed(self):
+        """Длинный текст сжимается, короткий хранится как есть."""
+        stored = self.get_stored(self.long_note)
+        self.assertEqual(stored[:1], ZLIB)
+        self.assertLess(len(stored), len(self.LONG_TEXT.encode()) / 10)
+        self.assertEqual(
+            self.get_stored(self.short_note), RAW + 'Текст'.encode()
+        )
+
+    def test_text_is_decompressed_lazily(self):
+        """Текст распаковывается при обращении, а сохранение без правки
+        текста записывает те же байты.
+        """
+        note = Note.objects.get(pk=self.long_note.pk)
+        self.assertIsInstance(note.__dict__['text'], CompressedText)
+        note.title = 'Новый лог'
+        note.save()
+        self.assertIsInstance(note.__dict__['text'], CompressedText)
+        self.assertEqual(note.text, self.LONG_TEXT)
+        self.assertEqual(
+            self.get_stored(note), self.get_stored(self.long_note)
+        )
+
+    def test_compressed_text_is_searchable(self):
+        results = search_notes(self.author, 'соединение', 10)
+        self.assertEqual([result.id for result in results],
+                         [self.long_note.id])
+
+    def test_search_index_without_sql_functions(self):
+        """Схема не вызывает notes_text, поэтому писать в notes_note может
+        любой клиент SQLite; индекс поиска обновляется из Python.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE sql LIKE '%notes_text%'"
+            )
+            self.assertEqual(cursor.fetchall(), [])
+        self.long_note.text = 'Маршрутизатор перезагружен'
+        self.long_note.save()
+        self.assertEqual(search_notes(self.author, 'соединение', 10), [])
+        self.assertEqual(
+            len(search_notes(self.author, 'маршрутизатор', 10)), 1
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notes_note SET title = %s WHERE id = %s',
+                ('Коммутатор', self.short_note.id)
+            )
+        self.assertEqual(search_notes(self.author, 'коммутатор', 10), [])
+        call_command('reindex_notes', stdout=StringIO())
+        self.assertEqual(
+            len(search_notes(self.author, 'коммутатор', 10)), 1
+        )
+        self.long_note.delete()
+        self.assertEqual(search_notes(self.author, 'маршрутизатор', 10), [])
+
+    def test_compress_notes_command(self):
+        output = StringIO()
+        with self.settings(NOTES_COMPRESSION='lzma'):
+            call_command('compress_notes', stdout=output)
+        self.assertIn('Заметок: 2, перезаписано: 1', output.getvalue())
+        self.assertEqual(Note.objects.get(pk=self.long_note.pk).text,
+                         self.LONG_TEXT)
+
+
+@override_settings(NOTES_REVISION_SNAPSHOT_EVERY=4)
+class TestNoteRevisions(TestCase):
+    LINES = [f'Строка {index}\n' for index in range(200)]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='title', text=''.join(cls.LINES), slug=SLUG,
+            author=cls.author
+        )
+        cls.versions = [cls.note.text]
+        for index in range(1, 10):
+            lines = cls.LINES.copy()
+            lines[index * 10] = f'Правка {index}\n'
+            cls.note.text = ''.join(lines)
+            cls.note.save()
+            cls.versions.append(cls.note.text)
+
+    def test_every_version_is_reconstructed(self):
+        """Любая версия восстанавливается не более чем из K - 1
+        изменений поверх полной копии.
+        """
+        for number, text in enumerate(self.versions, 1):
+            with self.subTest(number=number):
+                chain = get_chain(self.note.pk, number)
+                self.assertTrue(chain[0].is_snapshot)
+                self.assertLessEqual(len(chain), 4)
+                self.assertEqual(reconstruct(chain), text)
+
+    def test_snapshot_interval_lowered(self):
+        """После уменьшения K старые цепочки по-прежнему идут от полной
+        копии, а следующая версия сохраняется целиком.
+        """
+        with self.settings(NOTES_REVISION_SNAPSHOT_EVERY=2):
+            for number, text in enumerate(self.versions, 1):
+                with self.subTest(number=number):
+                    chain = get_chain(self.note.pk, number)
+                    self.assertEqual(reconstruct(chain), text)
+            self.note.text = 'Новый текст'
+            self.note.save()
+        revision = NoteRevision.objects.get(note=self.note, number=11)
+        self.assertTrue(revision.is_snapshot)
+        self.assertEqual(reconstruct(get_chain(self.note.pk)), 'Новый текст')
+
+    def test_chain_without_snapshot_is_rejected(self):
+        chain = get_chain(self.note.pk, 8)
+        with self.assertRaises(ValueError):
+            reconstruct(chain[1:])
+
+    def test_delta_size_is_proportional_to_change(self):
+        revision = NoteRevision.objects.get(note=self.note, number=2)
+        self.assertFalse(revision.is_snapshot)
+        self.assertLess(len(revision.data), 100)
+        self.assertEqual(
+            list(NoteRevision.objects.filter(
+                note=self.note, is_snapshot=True
+            ).values_list('number', flat=True)),
+            [9, 5, 1]
+        )
+
+    def test_unchanged_save_adds_no_revision(self):
+        note = Note.objects.get(pk=self.note.pk)
+        note.save()
+        self.assertEqual(note.revisions.count(), len(self.versions))
+
+    def test_history_page_shows_version(self):
+        response = self.author_client.get(HISTORY_URL, {'revision': 3})
+        self.assertEqual(response.context['revision_text'], self.versions[2])
+        self.assertEqual(len(response.context['revisions']), 10)
+        for revision in (99, '²', '-1', '١', 10 ** 30):
+            with self.subTest(revision=revision):
+                response = self.author_client.get(
+                    HISTORY_URL, {'revision': revision}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_prune_revisions(self):
+        """После очистки старейшая оставшаяся версия становится полной
+        копией, и все оставшиеся версии восстанавливаются.
+        """
+        call_command('prune_revisions', keep=3, stdout=StringIO())
+        revisions = NoteRevision.objects.filter(note=self.note)
+        self.assertEqual(
+            list(revisions.values_list('number', 'is_snapshot')),
+            [(10, False), (9, True), (8, True)]
+        )
+        for number in (8, 9, 10):
+            self.assertEqual(
+                reconstruct(get_chain(self.note.pk, number)),
+                self.versions[number - 1]
+            )
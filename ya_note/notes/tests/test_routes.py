@@ -15,11 +15,15 @@ LOGIN_URL = reverse('users:login')
 LOGOUT_URL = reverse('users:logout')
 SIGNUP_URL = reverse('users:signup')
 NOTES_LIST_URL = reverse('notes:list')
+SEARCH_URL = reverse('notes:search')
+IMPORT_URL = reverse('notes:import')
+EXPORT_URL = reverse('notes:export')
 ADD_NOTE_URL = reverse('notes:add')
 SUCCESS_URL = reverse('notes:success')
 DETAIL_NOTE_URL = reverse('notes:detail', args=(SLUG,))
 EDIT_NOTE_URL = reverse('notes:edit', args=(SLUG,))
 DELETE_NOTE_URL = reverse('notes:delete', args=(SLUG,))
+HISTORY_NOTE_URL = reverse('notes:history', args=(SLUG,))
 
 
 class TestRoutes(TestCase):
@@ -42,11 +46,15 @@ class TestRoutes(TestCase):
             LOGIN_URL,
             SIGNUP_URL,
             NOTES_LIST_URL,
+            SEARCH_URL,
+            IMPORT_URL,
+            EXPORT_URL,
             ADD_NOTE_URL,
             SUCCESS_URL,
             DETAIL_NOTE_URL,
             EDIT_NOTE_URL,
             DELETE_NOTE_URL,
+            HISTORY_NOTE_URL,
             LOGOUT_URL,
         )
 
@@ -61,7 +69,9 @@ class TestRoutes(TestCase):
         """Не автор не имеет доступа к редактирванию, удалению и просмотру
         чужих заметок.
         """
-        author_urls = (EDIT_NOTE_URL, DELETE_NOTE_URL, DETAIL_NOTE_URL)
+        author_urls = (
+            EDIT_NOTE_URL, DELETE_NOTE_URL, DETAIL_NOTE_URL, HISTORY_NOTE_URL
+        )
         for name in self.urls:
             with self.subTest(name=name):
                 response = self.client_reader.get(name)
@@ -0,0 +1,21 @@
+import sqlite3
+from contextlib import closing
+
+from django.db import connection
+from django.db.migrations.recorder import MigrationRecorder
+from django.test import TestCase
+
+
+class TestSchemaSnapshot(TestCase):
+
+    def test_database_copied_from_snapshot(self):
+        """Тестовая база скопирована из снимка со всеми миграциями."""
+        with closing(sqlite3.connect(
+            connection.creation.get_snapshot_path()
+        )) as snapshot:
+            applied = snapshot.execute(
+                'SELECT COUNT(*) FROM django_migrations'
+            ).fetchone()[0]
+        self.assertEqual(
+            applied, MigrationRecorder(connection).migration_qs.count()
+        )
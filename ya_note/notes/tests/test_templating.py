@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.caching import get_version
+from notes.models import Note
+from yacommon.templating import warm_up_templates
+
+User = get_user_model()
+
+SLUG = 'slug'
+
+LIST_URL = reverse('notes:list')
+
+
+@override_settings(CACHES={
+    **settings.CACHES,
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'template-fragments',
+    },
+})
+class TestTemplateFragments(TestCase):
+    """Шапка и список заметок кешируются фрагментами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug=SLUG, author=cls.author
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def get_list_key(self):
+        return make_template_fragment_key('note_list', [
+            self.author.pk, get_version(self.author.pk),
+            settings.NOTES_COUNT_ON_LIST_PAGE, '',
+        ])
+
+    def test_fragments_cached(self):
+        self.author_client.get(LIST_URL)
+        cache = caches['template_fragments']
+        header_key = make_template_fragment_key(
+            'header', [self.author.pk, self.author.username]
+        )
+        self.assertIn(self.author.username, cache.get(header_key))
+        self.assertIn(self.note.title, cache.get(self.get_list_key()))
+
+    def test_note_change_refreshes_list(self):
+        self.author_client.get(LIST_URL)
+        self.note.title = 'Новый заголовок'
+        self.note.save()
+        response = self.author_client.get(LIST_URL)
+        self.assertContains(response, 'Новый заголовок')
+
+    def test_warm_up_templates(self):
+        self.assertGreater(warm_up_templates(), 0)
@@ -0,0 +1,103 @@
+"""
+Импорт и экспорт заметок в формате JSON Lines.
+
+Файл читается и пишется построчно, заметки проверяются и создаются
+пачками, поэтому расход памяти не зависит от размера файла.
+"""
+import json
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Max
+
+from .caching import invalidate
+from .models import Note
+from .revisions import snapshot_notes
+from .search import index_notes
+from .slugs import bulk_create_with_slugs
+
+EXPORT_FIELDS = ('title', 'text', 'slug')
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+    elapsed: float = 0
+
+    @property
+    def rate(self):
+        """Скорость импорта в строках в секунду."""
+        return self.created / self.elapsed if self.elapsed else 0
+
+    def add_error(self, line_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'Строка {line_number}: {message}')
+
+
+def export_notes(queryset, chunk_size=None):
+    """Строки JSONL с заметками, выбранные из базы порциями."""
+    rows = queryset.order_by('id').values(*EXPORT_FIELDS).iterator(
+        chunk_size=chunk_size or settings.NOTES_TRANSFER_BATCH_SIZE
+    )
+    for row in rows:
+        row['text'] = str(row['text'])
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def parse_note(line, author):
+    """Заметка из строки JSONL; ошибки — ValidationError или ValueError."""
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError('ожидается объект JSON')
+    for name in EXPORT_FIELDS:
+        # Иначе число в slug роняет подбор slug, а список в title
+        # сохраняется строкой "['...']".
+        if data.get(name) is not None and not isinstance(data[name], str):
+            raise ValueError(f'поле {name} должно быть строкой')
+    note = Note(
+        title=data.get('title') or Note._meta.get_field('title').default,
+        text=data.get('text', ''),
+        slug=data.get('slug') or '',
+        author=author,
+    )
+    note.full_clean(exclude=('author', 'slug'), validate_unique=False)
+    if note.slug:
+        Note._meta.get_field('slug').run_validators(note.slug)
+    return note
+
+
+def import_notes(lines, author, batch_size=None):
+    """Создаёт заметки автора из строк JSONL пачками по batch_size."""
+    batch_size = batch_size or settings.NOTES_TRANSFER_BATCH_SIZE
+    result = ImportResult()
+    started = time.monotonic()
+    last_id = Note.objects.aggregate(last=Max('pk'))['last'] or 0
+    batch = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            batch.append(parse_note(line, author))
+        except ValidationError as error:
+            result.add_error(line_number, '; '.join(error.messages))
+        except ValueError as error:
+            result.add_error(line_number, str(error))
+        if len(batch) == batch_size:
+            result.created += len(bulk_create_with_slugs(Note, batch))
+            batch = []
+    if batch:
+        result.created += len(bulk_create_with_slugs(Note, batch))
+    if result.created:
+        # bulk_create не отправляет сигналы: первые версии в истории,
+        # индекс поиска и сброс кеша делаются здесь.
+        snapshot_notes(Note.objects.filter(author=author))
+        index_notes(Note.objects.filter(author=author, pk__gt=last_id))
+        invalidate(author.pk)
+    result.elapsed = time.monotonic() - started
+    return result
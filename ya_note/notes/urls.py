@@ -10,6 +10,12 @@ urlpatterns = [
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
+    path(
+        'history/<slug:slug>/', views.NoteHistory.as_view(), name='history'
+    ),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('export/', views.NoteExport.as_view(), name='export'),
+    path('import/', views.NoteImport.as_view(), name='import'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
@@ -1,59 +1,193 @@
+import re
+from functools import partial
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .caching import get_or_compute, get_version
+from .forms import WARNING, NoteForm, NoteImportForm
 from .models import Note
+from .revisions import get_chain, reconstruct
+from .search import search_notes
+from .transfer import export_notes, import_notes
+
+from yacommon.mixins import CachedObjectMixin
+from yacommon.pagination import KeysetPaginationMixin, KeysetPaginator
 
 
 class Home(generic.TemplateView):
     """Домашняя страница."""
     template_name = 'notes/home.html'
+    # Наибольшее число SQL-запросов за запрос, включая сессию
+    # и пользователя (см. instrumentation).
+    query_budget = 2
 
 
 class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
     """Страница успешного выполнения операции."""
     template_name = 'notes/success.html'
+    query_budget = 2
 
 
-class NoteBase(LoginRequiredMixin):
+class NoteBase(LoginRequiredMixin, CachedObjectMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
+    # Для списков: загружать только эти поля, без текста заметок.
+    only_fields = None
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        queryset = self.model.objects.filter(author=self.request.user)
+        if self.only_fields:
+            queryset = queryset.only(*self.only_fields)
+        return queryset
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormMixin:
+    """Сохранение формы заметки без ошибки 500 при гонке за slug."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
+    """Добавление заметки."""
+    query_budget = 10
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
+    query_budget = 10
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
+    query_budget = 6
 
 
-class NotesList(NoteBase, generic.ListView):
+class NotesList(NoteBase, KeysetPaginationMixin, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    only_fields = ('id', 'slug', 'title')
+    keyset_ordering = ('id',)
+    query_budget = 3
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_COUNT_ON_LIST_PAGE
+
+    def paginate_queryset(self, queryset, page_size):
+        """Страница списка берётся из кеша автора."""
+        cursor = self.request.GET.get(self.cursor_kwarg, '')
+        paginator = KeysetPaginator(
+            queryset, self.keyset_ordering, page_size
+        )
+        page = get_or_compute(
+            self.request.user.pk, 'list', f'{page_size}:{cursor}',
+            partial(paginator.page, cursor),
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        """Версия кеша автора — ключ фрагмента со списком в шаблоне."""
+        context = super().get_context_data(**kwargs)
+        context['notes_version'] = get_version(self.request.user.pk)
+        return context
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+    query_budget = 3
+
+    def get_object(self, queryset=None):
+        """Заметка берётся из кеша автора."""
+        return get_or_compute(
+            self.request.user.pk, 'detail', self.kwargs[self.slug_url_kwarg],
+            partial(super().get_object, queryset),
+        )
+
+
+class NoteHistory(NoteBase, generic.DetailView):
+    """История заметки и просмотр любой её версии."""
+    template_name = 'notes/history.html'
+    revision_kwarg = 'revision'
+    # str.isdigit() пропускает «²» и другие цифры Unicode, на которых
+    # int() падает; 18 знаков всегда влезают в INTEGER SQLite.
+    revision_re = re.compile(r'[0-9]{1,18}')
+    query_budget = 5
+
+    def get_revision(self):
+        number = self.request.GET.get(self.revision_kwarg)
+        if not number:
+            return None, None
+        if not self.revision_re.fullmatch(number):
+            raise Http404
+        number = int(number)
+        chain = get_chain(self.object.pk, number)
+        if not chain or chain[-1].number != number:
+            raise Http404
+        return chain[-1], reconstruct(chain)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revision'], context['revision_text'] = self.get_revision()
+        context['revisions'] = self.object.revisions.defer('data')
+        return context
+
+
+class NoteSearch(NoteBase, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+    query_budget = 3
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['results'] = search_notes(
+            self.request.user, query, settings.NOTES_SEARCH_LIMIT
+        )
+        return context
+
+
+class NoteExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в формате JSON Lines."""
+    query_budget = 2
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(Note.objects.filter(author=request.user)),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'attachment; filename="notes.jsonl"'
+        return response
+
+
+class NoteImport(LoginRequiredMixin, generic.FormView):
+    """Загрузка заметок из файла JSON Lines."""
+    template_name = 'notes/import.html'
+    form_class = NoteImportForm
+    query_budget = 10
+
+    def form_valid(self, form):
+        result = import_notes(form.cleaned_data['file'], self.request.user)
+        return self.render_to_response(
+            self.get_context_data(form=form, result=result)
+        )
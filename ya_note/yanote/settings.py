@@ -1,9 +1,13 @@
+import sys
 from pathlib import Path
 
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Общий код ya_news и ya_note — пакет yacommon в корне репозитория.
+sys.path.append(str(BASE_DIR.parent))
+
 SECRET_KEY = 'django-insecure-yipnj$#j!ajarq%k55z4kuf3x79)91h0h42o9!1ho(z=!%mt=#'
 
 DEBUG = False
@@ -22,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yacommon.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -44,6 +49,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'yacommon.templating.fragment_cache',
             ],
         },
     },
@@ -52,14 +58,51 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# Настройки PRAGMAS, TRANSACTION_MODE и HEALTH_CHECKS описаны
+# в yacommon/sqlite/base.py.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yacommon.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'HEALTH_CHECKS': True,
+        'TRANSACTION_MODE': 'IMMEDIATE',
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -20000,
+        },
     }
 }
 
 
+# locmem годится для тестов и одного процесса. Если воркеров несколько,
+# нужен общий бэкенд: FileBasedCache с LOCATION в каталоге на диске
+# или DatabaseCache (после manage.py createcachetable).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Тег {% cache %} пишет в этот кеш. DummyCache ничего не хранит:
+    # при разработке правки шаблонов видны сразу.
+    'template_fragments': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+# Сессия читается из кеша, в базу идёт только запись.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии читается через кеш (см. yacommon/auth.py);
+# AUTH_USER_CACHE_TIMEOUT = 0 отключает кеш.
+AUTHENTICATION_BACKENDS = ['yacommon.auth.CachedModelBackend']
+
+AUTH_USER_CACHE_ALIAS = 'default'
+
+AUTH_USER_CACHE_TIMEOUT = 300
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
@@ -87,3 +130,51 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+NOTES_SEARCH_LIMIT = 50
+
+NOTES_TRANSFER_BATCH_SIZE = 1000
+
+NOTES_CACHE_ALIAS = 'default'
+
+NOTES_CACHE_TIMEOUT = 300
+
+NOTES_MARKDOWN_CACHE_SIZE = 32 * 1024 * 1024
+
+# Тексты длиннее порога (в байтах UTF-8) хранятся сжатыми: zlib или lzma.
+NOTES_COMPRESSION = 'zlib'
+
+NOTES_COMPRESSION_MIN_SIZE = 1024
+
+# Каждая K-я версия заметки хранится целиком, остальные — изменениями.
+NOTES_REVISION_SNAPSHOT_EVERY = 10
+
+# Срок жизни фрагментов {% cache %}, секунды, и прогрев шаблонов при
+# старте процесса. Кеш фрагментов и прогрев включаются
+# в yanote/production_settings.py.
+TEMPLATE_FRAGMENT_CACHE_TIMEOUT = 300
+
+TEMPLATE_WARMUP = False
+
+# Замеры запросов: заголовок Server-Timing и строка журнала на запрос.
+REQUEST_TIMING = True
+
+# Превышение query_budget представления: False — предупреждение
+# в журнале, True — исключение (включается в тестах).
+QUERY_BUDGET_STRICT = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yacommon.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -0,0 +1,18 @@
+"""
+Настройки для тестов: база в памяти, схема которой копируется из
+снимка вместо прогона миграций (см. yacommon/sqlite/creation.py),
+и быстрый хешер паролей.
+"""
+from pathlib import Path
+from tempfile import gettempdir
+
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES
+
+# NAME не задан: Django создаёт базу SQLite в памяти, у каждого процесса
+# свою. Снимок один на все процессы и все прогоны.
+DATABASES['default']['TEST'] = {
+    'SNAPSHOT': Path(gettempdir()) / 'yanote-test-snapshots',
+}
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,55 @@
+"""
+Пользователь сессии из кеша.
+
+AuthenticationMiddleware на каждом запросе получает пользователя через
+get_user бэкенда аутентификации — это запрос к auth_user. С бэкендом
+CachedModelBackend пользователь берётся из кеша AUTH_USER_CACHE_ALIAS,
+а в базу запрос идёт только при промахе. Запись сбрасывают сохранение
+и удаление пользователя (смена пароля тоже сохраняет его) и выход
+из учётной записи, см. signals.py приложений.
+
+Хеш сессии по-прежнему сверяется с паролем пользователя, теперь
+из кеша: после смены пароля другие сессии перестают действовать, как
+только запись сброшена. QuerySet.update() сигналов не шлёт — такие
+изменения видны не позже чем через AUTH_USER_CACHE_TIMEOUT секунд.
+С локальным кешем сброс виден только в своём процессе; для нескольких
+воркеров нужен общий бэкенд кеша.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+USER_KEY = 'auth:user:{user_id}'
+
+
+def get_cache():
+    return caches[settings.AUTH_USER_CACHE_ALIAS]
+
+
+def invalidate_user(user_id):
+    """
+    Сбрасывает запись пользователя сразу и ещё раз после коммита
+    транзакции: параллельный запрос мог прочитать из базы старую строку
+    и успеть положить её в кеш.
+    """
+    key = USER_KEY.format(user_id=user_id)
+    get_cache().delete(key)
+    transaction.on_commit(lambda: get_cache().delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который читает пользователя по id через кеш."""
+
+    def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(user_id)
+        cache = get_cache()
+        key = USER_KEY.format(user_id=user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user
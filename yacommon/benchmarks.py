@@ -0,0 +1,273 @@
+"""
+Замеры горячих путей проекта.
+
+Сценарий — это подготовка (вне замера) и один HTTP-запрос. Сценарии
+прогоняются через тестовый клиент Django и через настоящий WSGI-сервер
+в соседнем потоке. Для каждого считаются перцентили p50/p95/p99
+времени ответа и число SQL-запросов, которое middleware замеров
+отдаёт в заголовке Server-Timing. Итог сравнивается с сохранённым
+базовым JSON.
+"""
+import json
+import logging
+import re
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from http.client import HTTPConnection
+from http.cookies import SimpleCookie
+from tempfile import TemporaryDirectory
+from urllib.parse import urlencode
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from . import instrumentation
+
+QUERIES_PATTERN = re.compile(r'desc="(\d+) queries"')
+PERCENTILES = {'p50': 50, 'p95': 95, 'p99': 99}
+# Все запросы идут с этим Host: он есть в ALLOWED_HOSTS.
+HOST = 'localhost'
+
+
+class BenchmarkFailed(Exception):
+    """Запрос сценария завершился ошибкой."""
+
+
+class Scenario:
+    """
+    Горячий путь: пользователь (None — аноним) и функция, которая
+    по номеру повтора возвращает (method, path, data). Функция
+    вызывается вне замера и может готовить данные, например создать
+    комментарий, который сценарий затем удалит.
+    """
+
+    def __init__(self, name, make_request, user=None):
+        self.name = name
+        self.make_request = make_request
+        self.user = user
+
+
+class ClientTransport:
+    """Тестовый клиент Django: весь стек обработки, но без сети."""
+    name = 'client'
+
+    @contextmanager
+    def running(self):
+        yield self
+
+    def session(self, user=None):
+        client = Client(HTTP_HOST=HOST)
+        if user is not None:
+            client.force_login(user)
+        return ClientSession(client)
+
+
+class ClientSession:
+
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, path, data=None):
+        response = getattr(self.client, method)(path, data or {})
+        return response.status_code, response.get('Server-Timing', '')
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WSGITransport:
+    """Запросы по HTTP к wsgiref-серверу с приложением проекта."""
+    name = 'wsgi'
+
+    @contextmanager
+    def running(self):
+        server = make_server(
+            '127.0.0.1', 0, WSGIHandler(),
+            handler_class=QuietRequestHandler,
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.address = server.server_address
+        try:
+            yield self
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+    def session(self, user=None):
+        return WSGISession(self.address, user)
+
+
+class WSGISession:
+    """
+    Хранит cookie между запросами. CSRF-токен из cookie отправляется
+    и в заголовке, как это делает страница с формой; первый токен
+    придумывается заранее, дальше его меняет сервер (например, при входе).
+    """
+
+    def __init__(self, address, user=None):
+        self.address = address
+        self.cookies = {settings.CSRF_COOKIE_NAME: get_random_string(64)}
+        if user is not None:
+            client = Client(HTTP_HOST=HOST)
+            client.force_login(user)
+            name = settings.SESSION_COOKIE_NAME
+            self.cookies[name] = client.cookies[name].value
+
+    def request(self, method, path, data=None):
+        body = urlencode(data or {})
+        headers = {
+            'Host': HOST,
+            'Cookie': '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()
+            ),
+            'X-CSRFToken': self.cookies[settings.CSRF_COOKIE_NAME],
+        }
+        if method == 'post':
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        else:
+            path, body = f'{path}?{body}' if body else path, None
+        connection = HTTPConnection(*self.address)
+        try:
+            connection.request(method.upper(), path, body, headers)
+            response = connection.getresponse()
+            response.read()
+        finally:
+            connection.close()
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        return response.status, response.getheader('Server-Timing', '')
+
+
+def summarize(durations, queries):
+    cuts = statistics.quantiles(durations, n=100, method='inclusive')
+    summary = {
+        name: round(cuts[percent - 1] * 1000, 2)
+        for name, percent in PERCENTILES.items()
+    }
+    summary['queries'] = statistics.median_low(queries)
+    return summary
+
+
+def run_scenario(transport, scenario, requests, warmup):
+    session = transport.session(scenario.user)
+    durations, queries = [], []
+    for index in range(warmup + requests):
+        method, path, data = scenario.make_request(index)
+        started = time.perf_counter()
+        status, timing = session.request(method, path, data)
+        duration = time.perf_counter() - started
+        if status >= 400:
+            raise BenchmarkFailed(
+                f'{transport.name}/{scenario.name}: '
+                f'{method.upper()} {path} вернул {status}'
+            )
+        if index >= warmup:
+            durations.append(duration)
+            match = QUERIES_PATTERN.search(timing)
+            queries.append(int(match[1]) if match else 0)
+    return summarize(durations, queries)
+
+
+def run_benchmarks(transports, scenarios, requests, warmup=5):
+    """{транспорт: {сценарий: {p50, p95, p99, queries}}}; перед каждым
+    транспортом кеши очищаются.
+    """
+    # Строка журнала на каждый запрос только мешает читать итог.
+    instrumentation.logger.setLevel(logging.WARNING)
+    results = {}
+    for transport in transports:
+        for cache in caches.all():
+            cache.clear()
+        with transport.running():
+            results[transport.name] = {
+                scenario.name: run_scenario(
+                    transport, scenario, requests, warmup
+                )
+                for scenario in scenarios
+            }
+    return results
+
+
+def format_results(results):
+    lines = []
+    for transport, scenarios in results.items():
+        for name, summary in scenarios.items():
+            lines.append(
+                f'{transport:>6} {name:<14}' + ''.join(
+                    f' {key} {summary[key]:8.2f} мс'
+                    for key in PERCENTILES
+                ) + f'  SQL {summary["queries"]}'
+            )
+    return '\n'.join(lines)
+
+
+def find_regressions(results, baseline, tolerances):
+    """
+    Сценарии, которые делают больше SQL-запросов, чем в базовом замере,
+    или стали медленнее: tolerances — допустимое замедление по каждому
+    проверяемому перцентилю, доля от базового. Сценарии, которых нет
+    в базовом файле, не проверяются.
+    """
+    regressions = []
+    for transport, scenarios in results.items():
+        for name, summary in scenarios.items():
+            base = baseline.get(transport, {}).get(name)
+            if base is None:
+                continue
+            label = f'{transport}/{name}'
+            if summary['queries'] > base['queries']:
+                regressions.append(
+                    f'{label}: SQL-запросов {summary["queries"]}, '
+                    f'в базовом замере {base["queries"]}'
+                )
+            for key, tolerance in tolerances.items():
+                if summary[key] > base[key] * (1 + tolerance):
+                    regressions.append(
+                        f'{label}: {key} {summary[key]:.2f} мс, '
+                        f'в базовом замере {base[key]:.2f} мс'
+                    )
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(path, results):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+        file.write('\n')
+
+
+@contextmanager
+def temporary_database(aliases):
+    """Все aliases смотрят в новый файл SQLite с применёнными миграциями."""
+    originals = {alias: dict(connections.settings[alias]) for alias in aliases}
+    connections.close_all()
+    try:
+        with TemporaryDirectory() as directory:
+            for alias in aliases:
+                connections.settings[alias]['NAME'] = (
+                    f'{directory}/bench.sqlite3'
+                )
+            call_command('migrate', verbosity=0)
+            yield
+    finally:
+        connections.close_all()
+        for alias, original in originals.items():
+            connections.settings[alias].update(original)
@@ -0,0 +1,177 @@
+"""
+Замеры каждого запроса: число SQL-запросов, время в базе, время
+отрисовки шаблона и время представления.
+
+Результат уходит в заголовок Server-Timing и в строку журнала
+``yacommon.instrumentation`` вида ``ключ=значение``. Представление может
+объявить атрибут ``query_budget`` — наибольшее число SQL-запросов
+за HTTP-запрос, включая сессию и пользователя. Превышение бюджета
+пишется в журнал как предупреждение, а при QUERY_BUDGET_STRICT
+(в тестах) вызывает QueryBudgetExceeded.
+
+Время отрисовки разбито и по отдельным шаблонам: каждый вызов
+Template.render — страница и каждый {% include %} — суммируется по имени
+шаблона. Время включает вложенные шаблоны; base.html из {% extends %}
+входит во время страницы.
+
+Запросы, которые выполняются при отдаче потокового ответа, уже после
+возврата из middleware, не учитываются.
+"""
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+_metrics = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем объявило."""
+
+
+class RequestMetrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.render_started = None
+        self.view_name = None
+        self.query_budget = None
+        self.templates = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка выполнения запросов (connection.execute_wrapper)."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def render_finished(self, response):
+        self.template_time += time.perf_counter() - self.render_started
+
+    def get_timings(self):
+        """Длительности в миллисекундах."""
+        total = time.perf_counter() - self.started
+        return {
+            'db': self.db_time * 1000,
+            'tpl': self.template_time * 1000,
+            'view': (total - self.template_time) * 1000,
+            'total': total * 1000,
+        }
+
+
+def timed_render(render):
+    """Обёртка Template.render, которая копит время по имени шаблона
+    в замерах текущего запроса.
+    """
+    @wraps(render)
+    def wrapper(template, context):
+        metrics = _metrics.get()
+        if metrics is None:
+            return render(template, context)
+        started = time.perf_counter()
+        try:
+            return render(template, context)
+        finally:
+            metrics.templates[template.name or '<string>'] += (
+                time.perf_counter() - started
+            )
+    wrapper.timed = True
+    return wrapper
+
+
+def install_template_timing():
+    if not getattr(Template.render, 'timed', False):
+        Template.render = timed_render(Template.render)
+
+
+def format_server_timing(metrics, timings):
+    parts = [
+        f'db;dur={timings["db"]:.1f};desc="{metrics.queries} queries"',
+        *(
+            f'{name};dur={timings[name]:.1f}'
+            for name in ('tpl', 'view', 'total')
+        ),
+        *(
+            f'tpl-part;dur={seconds * 1000:.1f};desc="{name}"'
+            for name, seconds in metrics.templates.items()
+        ),
+    ]
+    return ', '.join(parts)
+
+
+def format_log_line(request, response, metrics, timings):
+    fields = {
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'view': metrics.view_name or '-',
+        'queries': metrics.queries,
+        **{f'{name}_ms': f'{value:.1f}' for name, value in timings.items()},
+        'templates': ','.join(
+            f'{name}:{seconds * 1000:.1f}'
+            for name, seconds in metrics.templates.items()
+        ) or '-',
+    }
+    return ' '.join(f'{key}={value}' for key, value in fields.items())
+
+
+class RequestTimingMiddleware:
+    """Включается настройкой REQUEST_TIMING; ставится первым в MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        install_template_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        token = _metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _metrics.reset(token)
+        timings = metrics.get_timings()
+        response['Server-Timing'] = format_server_timing(metrics, timings)
+        logger.info(format_log_line(request, response, metrics, timings))
+        self.check_budget(metrics)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, 'view_class', view_func)
+        request.metrics.view_name = f'{view.__module__}.{view.__qualname__}'
+        request.metrics.query_budget = getattr(view, 'query_budget', None)
+
+    def process_template_response(self, request, response):
+        request.metrics.render_started = time.perf_counter()
+        response.add_post_render_callback(request.metrics.render_finished)
+        return response
+
+    def check_budget(self, metrics):
+        budget = metrics.query_budget
+        if budget is None or metrics.queries <= budget:
+            return
+        message = (
+            f'{metrics.view_name}: {metrics.queries} SQL-запросов '
+            f'при бюджете {budget}'
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
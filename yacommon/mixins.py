@@ -0,0 +1,15 @@
+class CachedObjectMixin:
+    """
+    Запоминает объект, полученный через get_object, на время запроса.
+
+    Экземпляр CBV создаётся заново для каждого запроса, поэтому
+    повторные вызовы get_object (например, из get_success_url)
+    не обращаются к базе ещё раз.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_cached_object'):
+            self._cached_object = super().get_object()
+        return self._cached_object
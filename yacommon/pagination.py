@@ -0,0 +1,147 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import BadRequest, ValidationError
+from django.db.models import Q
+
+NEXT = 'n'
+PREVIOUS = 'p'
+INVALID_CURSOR = 'Некорректный курсор пагинации.'
+
+
+def encode_cursor(direction, values):
+    """Упаковывает направление и значения ключа в непрозрачную строку."""
+    raw = json.dumps([direction, *map(str, values)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает курсор; при ошибке возвращает ответ 400."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, *values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError, TypeError):
+        raise BadRequest(INVALID_CURSOR)
+    # encode_cursor пишет значения строками; всё прочее — подделка.
+    if direction not in (NEXT, PREVIOUS) or not all(
+        isinstance(value, str) for value in values
+    ):
+        raise BadRequest(INVALID_CURSOR)
+    return direction, values
+
+
+class KeysetPage:
+    """Страница, полученная поиском по ключу, а не через OFFSET."""
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по составному ключу (seek-пагинация).
+
+    Каждая страница — один запрос с условием «после ключа» и LIMIT,
+    поэтому стоимость не зависит от глубины страницы при наличии индекса
+    по полям ordering.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+
+    def _key(self, obj):
+        return [getattr(obj, name) for name, _ in self.fields]
+
+    def _parse_values(self, values):
+        if len(values) != len(self.fields):
+            raise BadRequest(INVALID_CURSOR)
+        model = self.queryset.model
+        try:
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except (ValidationError, TypeError, ValueError, OverflowError):
+            raise BadRequest(INVALID_CURSOR)
+
+    def _seek(self, values, backwards):
+        """Условие «строго после ключа» в выбранном направлении."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        first_name, first_descending = self.fields[0]
+        bound = 'lte' if first_descending != backwards else 'gte'
+        return Q(**{f'{first_name}__{bound}': values[0]}) & condition
+
+    def page(self, cursor=None):
+        """Возвращает страницу, на которую указывает курсор."""
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = decode_cursor(cursor)
+            values = self._parse_values(values)
+        backwards = direction == PREVIOUS
+        queryset = self.queryset
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            )
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        try:
+            rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        except OverflowError:
+            # Число из курсора не помещается в целое SQLite.
+            raise BadRequest(INVALID_CURSOR)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else values is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(NEXT, self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(PREVIOUS, self._key(rows[0]))
+        return KeysetPage(rows, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """Подключает KeysetPaginator к ListView через paginate_queryset."""
+    keyset_ordering = None
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, self.keyset_ordering, page_size
+        )
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,75 @@
+"""
+SQLite для продакшена: WAL, PRAGMA и постоянные соединения.
+
+Поддерживает в записи DATABASES дополнительные ключи:
+
+* PRAGMAS — словарь PRAGMA, которые выполняются на каждом новом
+  соединении (по умолчанию WAL, synchronous=NORMAL, busy_timeout,
+  mmap_size и cache_size);
+* TRANSACTION_MODE — режим BEGIN для транзакций: с IMMEDIATE запись
+  берёт блокировку сразу и ждёт её по busy_timeout, а не падает
+  с «database is locked» при повышении чтения до записи;
+* HEALTH_CHECKS — перед первым использованием в запросе постоянное
+  соединение (CONN_MAX_AGE > 0) проверяется запросом SELECT 1
+  и при ошибке открывается заново, как в Django 4.1+.
+
+В TEST можно задать SNAPSHOT — каталог для снимков мигрированной
+тестовой базы (см. creation.py).
+"""
+from django.db.backends.sqlite3 import base
+
+from .creation import DatabaseCreation
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+
+    @property
+    def pragmas(self):
+        return self.settings_dict.get('PRAGMAS', DEFAULT_PRAGMAS)
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict.get('TRANSACTION_MODE')
+        self.cursor().execute(f'BEGIN {mode}' if mode else 'BEGIN')
+
+    def is_usable(self):
+        try:
+            self.connection.execute('SELECT 1')
+        except base.Database.Error:
+            return False
+        return True
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце каждого запроса.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
+
+    def ensure_connection(self):
+        if (
+            self.connection is not None
+            and not self.health_check_done
+            and self.settings_dict.get('HEALTH_CHECKS')
+            and not self.in_atomic_block
+        ):
+            if not self.is_usable():
+                self.close()
+            self.health_check_done = True
+        super().ensure_connection()
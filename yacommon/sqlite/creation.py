@@ -0,0 +1,94 @@
+"""
+Тестовая база из снимка схемы.
+
+Если в TEST записи DATABASES задан ключ SNAPSHOT — каталог для снимков,
+миграции прогоняются только при первом создании тестовой базы: готовая
+база сохраняется в файл снимка, а следующие прогоны и параллельные
+процессы копируют снимок в свою базу через backup API SQLite. Имя
+снимка содержит хеш файлов миграций, поэтому новая или изменённая
+миграция приводит к новому снимку.
+"""
+import hashlib
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from tempfile import mkstemp
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.backends.sqlite3 import creation
+from django.db.migrations.loader import MigrationLoader
+
+
+def migrations_digest():
+    """Хеш содержимого всех файлов миграций проекта и Django."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    digest = hashlib.sha256()
+    for key in sorted(loader.disk_migrations):
+        module = sys.modules[loader.disk_migrations[key].__module__]
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def get_snapshot_path(self):
+        directory = self.connection.settings_dict['TEST'].get('SNAPSHOT')
+        if not directory:
+            return None
+        return Path(directory) / (
+            f'{self.connection.alias}-{migrations_digest()}.sqlite3'
+        )
+
+    def create_test_db(
+        self, verbosity=1, autoclobber=False, serialize=True, keepdb=False
+    ):
+        path = None if keepdb else self.get_snapshot_path()
+        if path is None:
+            return super().create_test_db(
+                verbosity, autoclobber, serialize, keepdb
+            )
+        if not path.exists():
+            name = super().create_test_db(
+                verbosity, autoclobber, serialize, keepdb
+            )
+            self.save_snapshot(path)
+            return name
+        if verbosity >= 1:
+            self.log(
+                f'Copying test database for alias '
+                f'{self._get_database_display_str(verbosity, path)}...'
+            )
+        name = self._create_test_db(verbosity, autoclobber, keepdb)
+        self.connection.close()
+        settings.DATABASES[self.connection.alias]['NAME'] = name
+        self.connection.settings_dict['NAME'] = name
+        self.connection.ensure_connection()
+        source = sqlite3.connect(path)
+        try:
+            source.backup(self.connection.connection)
+        finally:
+            source.close()
+        if serialize:
+            self.connection._test_serialized_contents = (
+                self.serialize_db_to_string()
+            )
+        call_command('createcachetable', database=self.connection.alias)
+        return name
+
+    def save_snapshot(self, path):
+        """
+        Пишет снимок во временный файл рядом и переименовывает его:
+        параллельные процессы не увидят недописанный снимок.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporary = mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(descriptor)
+        target = sqlite3.connect(temporary)
+        try:
+            self.connection.ensure_connection()
+            self.connection.connection.backup(target)
+        finally:
+            target.close()
+        os.replace(temporary, path)
@@ -0,0 +1,50 @@
+"""
+Шаблоны в продакшен-профиле: прогрев кеша загрузчика и кеш фрагментов.
+
+warm_up_templates() компилирует все шаблоны проекта и приложений при
+старте процесса, чтобы первый запрос не платил за разбор. Имеет смысл
+с cached.Loader: без него скомпилированные шаблоны не сохраняются.
+
+Фрагменты {% cache fragment_cache_timeout ... %} хранятся в кеше
+template_fragments; при разработке это DummyCache, и кеш фрагментов
+фактически выключен.
+"""
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+
+def fragment_cache(request):
+    """Контекстный процессор: срок жизни кеша фрагментов."""
+    return {
+        'fragment_cache_timeout': settings.TEMPLATE_FRAGMENT_CACHE_TIMEOUT,
+    }
+
+
+def iter_template_names(engine):
+    directories = [*engine.dirs, *get_app_template_dirs('templates')]
+    for directory in map(Path, directories):
+        for path in sorted(directory.rglob('*.html')):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_up_templates():
+    """Загружает все шаблоны .html; возвращает число загруженных."""
+    loaded = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in iter_template_names(backend.engine):
+            try:
+                backend.get_template(name)
+            except TemplateSyntaxError as error:
+                logger.warning('Шаблон %s не прогрет: %s', name, error)
+            else:
+                loaded += 1
+    return loaded
@@ -0,0 +1,48 @@
+"""
+Общие фикстуры pytest. conftest.py проектов импортирует их по имени,
+чтобы pytest их нашёл.
+"""
+import os
+
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Кеш в памяти переживает откат транзакции теста, а id
+    пользователей после отката выдаются заново — чистим его.
+    """
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """В тестах превышение бюджета SQL-запросов — ошибка."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """
+    parallel_tests.py запускает части набора в отдельных процессах
+    с разными TEST_DB_SUFFIX. Файловая тестовая база получает суффикс;
+    база SQLite в памяти и так у каждого процесса своя.
+    """
+    suffix = os.getenv('TEST_DB_SUFFIX')
+    if not suffix:
+        return
+    for alias, database in settings.DATABASES.items():
+        test = database.setdefault('TEST', {})
+        if test.get('MIRROR'):
+            continue
+        name = test.get('NAME')
+        if not name:
+            if connections[alias].vendor == 'sqlite':
+                continue
+            name = f'test_{database["NAME"]}'
+        if name != ':memory:' and 'mode=memory' not in str(name):
+            test['NAME'] = f'{name}_{suffix}'